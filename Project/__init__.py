@@ -1,20 +1,25 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy.schema import CreateIndex
+from .cache import cache
+from .storage import storage, RoutingSession
 import secrets
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 
 def create_app():
     app = Flask(__name__)
     
     app.config['SECRET_KEY'] = secrets.token_hex(16)
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///bookings.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False  # optional but recommended
 
+    storage.init_app(app)
     db.init_app(app)
+    storage.install_pragmas(app, db)
     migrate.init_app(app, db)
+    cache.init_app(app)
     
     from .routes import main
     from .adminAuth import admin_Auth
@@ -23,6 +28,12 @@ def create_app():
     from .userAuth import userAuth
     from .userRoutes import userRoutes
     from .userRenewals import userRenewals
+    from .memberImport import memberImport
+    from .exports import exports
+    from .kiosk import kiosk
+    from .live import live, occupancy
+    from .analytics import analytics
+    from .pricing import pricing, prices
 
     app.register_blueprint(main)
     app.register_blueprint(admin_Auth)
@@ -31,10 +42,33 @@ def create_app():
     app.register_blueprint(userAuth)
     app.register_blueprint(userRoutes)
     app.register_blueprint(userRenewals)
+    app.register_blueprint(memberImport)
+    app.register_blueprint(exports)
+    app.register_blueprint(kiosk)
+    app.register_blueprint(live)
+    app.register_blueprint(analytics)
+    app.register_blueprint(pricing)
+
+    prices.init_app(app)
+
+    from .commands import register_commands
+    register_commands(app)
+
+    from .scheduler import scheduler
+    scheduler.init_app(app)
     
     with app.app_context():
-        from .models import Admin, Member, MembershipLog, GymPricing, Workout
+        from .models import Admin, Member, MembershipLog, GymPricing, Workout, AttendanceLog, Payment, DailyStats, MemberStats, ActivityCalendar, JobRun, MemberCodeSequence
         db.create_all()
+
+        # The unique (member_id, date) attendance index needs duplicates merged first
+        AttendanceLog.merge_duplicates()
+
+        # create_all() skips indexes on tables that already exist
+        with db.engine.begin() as conn:
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
         
         if not Admin.query.filter_by(username='admin').first():
             default_admin = Admin(username='admin')
@@ -54,5 +88,30 @@ def create_app():
             ]
             db.session.add_all(default_prices)
             db.session.commit()
+
+        # Effective-dated price table for zero-query lookups
+        prices.load()
+
+        # Seed unique_code sequences from existing codes (no-op once seeded)
+        MemberCodeSequence.seed_all()
+
+        # Existing databases predate the payment ledger
+        if Payment.query.first() is None:
+            Payment.backfill_from_members()
+
+        if DailyStats.query.first() is None:
+            from .rollups import rebuild_daily_stats
+            rebuild_daily_stats()
+
+        if MemberStats.query.first() is None:
+            from .rollups import rebuild_member_stats
+            rebuild_member_stats()
+
+        if ActivityCalendar.query.first() is None:
+            from .activity import rebuild_activity_calendars
+            rebuild_activity_calendars()
+
+        # Who is in the gym right now (kept current by check-in/out commits)
+        occupancy.rebuild()
         
     return app
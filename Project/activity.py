@@ -0,0 +1,146 @@
+from . import db
+from .models import ActivityCalendar, AttendanceLog, Workout
+from .rollups import _insert
+from datetime import date, timedelta
+from sqlalchemy import event, func
+import calendar
+
+KINDS = ('workout', 'attendance')
+MONTH_COLUMNS = [f"m{month}" for month in range(1, 13)]
+
+
+def _popcount(bits):
+    return bin(bits).count('1')
+
+
+# ========================================
+# WRITES (caller's transaction)
+# ========================================
+def mark_day(member_id, kind, day, connection=None):
+    """Set the bit for `day` with a single upsert (atomic OR, safe under concurrency)."""
+    column = MONTH_COLUMNS[day.month - 1]
+    bit = 1 << (day.day - 1)
+    stmt = _insert(ActivityCalendar, getattr(connection, 'dialect', None)).values(
+        member_id=member_id, kind=kind, year=day.year,
+        **{name: (bit if name == column else 0) for name in MONTH_COLUMNS}
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['member_id', 'kind', 'year'],
+        set_={column: getattr(ActivityCalendar, column).op('|')(bit)}
+    )
+    (connection or db.session).execute(stmt)
+
+
+def clear_day(member_id, kind, day, connection=None):
+    column = MONTH_COLUMNS[day.month - 1]
+    mask = ~(1 << (day.day - 1))
+    (connection or db.session).execute(
+        db.update(ActivityCalendar)
+        .where(ActivityCalendar.member_id == member_id, ActivityCalendar.kind == kind,
+               ActivityCalendar.year == day.year)
+        .values({column: getattr(ActivityCalendar, column).op('&')(mask)})
+    )
+
+
+@event.listens_for(Workout, 'after_insert')
+def _workout_inserted(mapper, connection, workout):
+    mark_day(workout.member_id, 'workout', workout.workout_date.date(), connection=connection)
+
+
+@event.listens_for(Workout, 'after_delete')
+def _workout_deleted(mapper, connection, workout):
+    # Only clear the day if this was the member's last workout on it
+    day = workout.workout_date.date()
+    start = workout.workout_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    others = connection.execute(
+        db.select(func.count())
+        .select_from(Workout)
+        .where(Workout.member_id == workout.member_id,
+               Workout.workout_date >= start, Workout.workout_date < start + timedelta(days=1))
+    ).scalar()
+    if not others:
+        clear_day(workout.member_id, 'workout', day, connection=connection)
+
+
+# ========================================
+# READS (bit operations on at most two rows)
+# ========================================
+def load_years(member_id, kind, years):
+    """{year: [12 month bitmaps]} for the requested years (missing years are all zero)."""
+    rows = (
+        ActivityCalendar.query
+        .filter(ActivityCalendar.member_id == member_id, ActivityCalendar.kind == kind,
+                ActivityCalendar.year.in_(years))
+    )
+    found = {row.year: row.months() for row in rows}
+    return {year: found.get(year, [0] * 12) for year in years}
+
+
+def streak(member_id, kind, today):
+    """Consecutive active days ending today (0 if today is not marked).
+
+    Reads this year's and last year's bitmaps, so streaks are counted back
+    to January 1 of last year at most.
+    """
+    years = load_years(member_id, kind, [today.year, today.year - 1])
+    year, month, last = today.year, today.month, today.day - 1  # last = bit index to start from
+    total = 0
+
+    while year in years:
+        bits = years[year][month - 1]
+        gaps = ~bits & ((1 << (last + 1)) - 1)  # unmarked days up to `last`
+        if gaps:
+            return total + last - (gaps.bit_length() - 1)
+        total += last + 1  # whole stretch marked; carry into the previous month
+
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        last = calendar.monthrange(year, month)[1] - 1
+    return total
+
+
+def days_in_month(member_id, kind, year, month):
+    return _popcount(load_years(member_id, kind, [year])[year][month - 1])
+
+
+def heatmap(member_id, kind, year):
+    """{month: [day numbers]} for one year, for calendar views."""
+    months = load_years(member_id, kind, [year])[year]
+    return {
+        month: [day for day in range(1, 32) if bits >> (day - 1) & 1]
+        for month, bits in enumerate(months, start=1) if bits
+    }
+
+
+# ========================================
+# REBUILD
+# ========================================
+def rebuild_activity_calendars():
+    """Recompute every bitmap from workouts and attendance rows; commits."""
+    bitmaps = {}
+
+    def add(member_id, kind, day):
+        months = bitmaps.setdefault((member_id, kind, day.year), [0] * 12)
+        months[day.month - 1] |= 1 << (day.day - 1)
+
+    workout_day = func.date(Workout.workout_date)
+    for member_id, day in (
+        db.session.execute(db.select(Workout.member_id, workout_day).distinct()
+                           .execution_options(yield_per=5000))
+    ):
+        add(member_id, 'workout', day if isinstance(day, date) else date.fromisoformat(day))
+
+    for member_id, day in (
+        db.session.execute(db.select(AttendanceLog.member_id, AttendanceLog.date)
+                           .where(AttendanceLog.time_in.is_not(None)).distinct()
+                           .execution_options(yield_per=5000))
+    ):
+        add(member_id, 'attendance', day)
+
+    db.session.query(ActivityCalendar).delete()
+    if bitmaps:
+        db.session.execute(db.insert(ActivityCalendar), [
+            {'member_id': member_id, 'kind': kind, 'year': year, **dict(zip(MONTH_COLUMNS, months))}
+            for (member_id, kind, year), months in bitmaps.items()
+        ])
+    db.session.commit()
+    return len(bitmaps)
@@ -1,53 +1,102 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
 from . import db
-from .models import Member, MembershipLog, GymPricing, RenewalRequest
-from datetime import datetime
+from .cache import cache
+from .models import Member, MembershipLog, RenewalRequest, Payment
+from .pricing import prices
+from .storage import read_only
+from .kiosk import member_codes
+from .members import unit_of_work, audit, collect_payment, register_member, record_change, remove_member, renew, decide_renewals
+from .rollups import bump, record_payment, member_key, month_buckets, active_by_type, active_by_month
+from datetime import datetime, timedelta
 from functools import lru_cache
 import pytz
-import calendar
-import time  # for time.time()
-from sqlalchemy import and_, func  # for and_ and func
+import time
+import json
+import base64
+import binascii
+from sqlalchemy import func, tuple_  # for func and keyset comparisons
+from sqlalchemy import insert, update  # for the set-based expiry sweep
 from sqlalchemy.orm import joinedload  # for joinedload used in renewal requests
 
 
 addMember = Blueprint('addMember', __name__)
 
-# Cache (in-memory)
-_cache_data = None
-_cache_time = 0
+# Members the sweep may still flip: end_date passed, not yet Expired.
+# Their effective_status is already 'Expired'; the sweep persists it.
+def lapsed(today):
+    return (Member.end_date < today, Member.status != "Expired")
+
+# Next chunk of lapsed member ids, in member_id order after `after_id`.
+def lapsed_members_query(today, after_id, limit):
+    return (
+        db.session.query(Member.member_id)
+        .filter(*lapsed(today), Member.member_id > after_id)
+        .order_by(Member.member_id)
+        .limit(limit)
+    )
 
 # Automatically mark members as expired if their end_date has passed.
-def auto_update_expired_members():
+# Set-based: each chunk is one conditional UPDATE ... RETURNING per prior
+# status plus one bulk insert of the logs, committed separately so check-ins
+# are never blocked behind a long transaction. The UPDATE repeats the lapse
+# condition, so a member changed since the chunk was read is neither expired
+# nor logged. Members that were Active leave the daily_stats Active count.
+def auto_update_expired_members(chunk_size=500):
     tz = pytz.timezone("Asia/Manila")
-    today = datetime.now(tz).date()
-
-    expired_members = Member.query.filter(
-        and_(
-            Member.end_date < today,
-            Member.status != "Expired"
-        )
-    ).all()
-
-    count = 0
-    for member in expired_members:
-        # Skip members manually set to Active (admin override)
-        if member.status == "Active":
-            continue
-
-        member.status = "Expired"
-        count += 1
-
-        log = MembershipLog(
-            member_id=member.member_id,
-            action_type='Status Update',
-            remarks=f"Automatically marked as expired (End date: {member.end_date})."
-        )
-        db.session.add(log)
-
-    if count > 0:
+    now = datetime.now(tz).replace(tzinfo=None)
+    today = now.date()
+    started = time.perf_counter()
+
+    expired = logged = batches = 0
+    last_id = 0
+    while True:
+        ids = [row[0] for row in lapsed_members_query(today, last_id, chunk_size)]
+        if not ids:
+            break
+
+        rows, left_active = [], {}
+        for previous in ("Active", "Inactive"):
+            for member_id, end_date, member_type, gym_plan in db.session.execute(
+                update(Member)
+                .where(Member.member_id.in_(ids), Member.status == previous, *lapsed(today))
+                .values(status=Member.effective_status)
+                .returning(Member.member_id, Member.end_date, Member.member_type, Member.gym_plan)
+                .execution_options(synchronize_session=False)
+            ):
+                rows.append((member_id, end_date))
+                if previous == "Active":
+                    key = (member_type, gym_plan)
+                    left_active[key] = left_active.get(key, 0) + 1
+        if rows:
+            db.session.execute(insert(MembershipLog), [
+                {
+                    "member_id": member_id,
+                    "action_type": "Status Update",
+                    "action_date": now,
+                    "remarks": f"Automatically marked as expired (End date: {end_date})."
+                }
+                for member_id, end_date in rows
+            ])
+        for (member_type, gym_plan), count in left_active.items():
+            bump(today, member_type, gym_plan, active_delta=-count)
         db.session.commit()
-
-    return count
+        expired += len(rows)
+        logged += len(rows)
+
+        batches += 1
+        last_id = ids[-1]
+        if len(ids) < chunk_size:
+            break
+
+    if expired > 0:
+        cache.invalidate('members')
+
+    return {
+        "expired": expired,
+        "logged": logged,
+        "batches": batches,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
 
 # Add Member
 @addMember.route('/admin/add-member', methods=['GET', 'POST'])
@@ -96,25 +145,15 @@ def add_member():
                 end_date=end_date
             )
 
-            # --- Fetch price based on type/plan ---
-            current_price = GymPricing.query.filter_by(
-                member_type=member_type,
-                plan_type=gym_plan
-            ).first()
-
-            new_member.price_paid = current_price.price if current_price else 0.0
+            # --- Price in force today for type/plan ---
+            new_member.price_paid = prices.price(member_type, gym_plan)
 
-            db.session.add(new_member)
-            db.session.commit()
-
-            # --- Log registration ---
-            new_log = MembershipLog(
-                member_id=new_member.member_id,
-                action_type='Registered',
-                remarks=f"Member {first_name} {last_name} registered successfully."
-            )
-            db.session.add(new_log)
-            db.session.commit()
+            # --- Member, payment and registration log in one transaction ---
+            with unit_of_work('members', 'payments'):
+                register_member(
+                    new_member, 'Registered',
+                    f"Member {first_name} {last_name} registered successfully."
+                )
 
             # --- JSON Response (for AJAX/fetch) ---
             if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -146,9 +185,8 @@ def add_member():
     # 📋 GET Request - Render Members Page
     # ===========================
     if request.method == 'GET':
-        members = Member.query.all()
-        auto_update_expired_members()  # check and update expired members
-        
+        # Members are fetched page by page from /admin/members-json (tables.js);
+        # expiry runs in the background scheduler / `flask expire-members`
         # Fetch renewal requests too
         renewal_requests = (
             RenewalRequest.query
@@ -156,10 +194,11 @@ def add_member():
             .order_by(RenewalRequest.request_date.desc())
             .all()
         )
-        return render_template('admin/members.html', members=members,renewal_requests=renewal_requests)
+        return render_template('admin/members.html', renewal_requests=renewal_requests)
 
 # View specific member details (AJAX endpoint)
 @addMember.route('/admin/member/<int:member_id>', methods=['GET'])
+@cache.cached(tags=('members',))
 def view_member(member_id):
     member = Member.query.get_or_404(member_id)
     
@@ -191,46 +230,45 @@ def edit_member(member_id):
     try:
         data = request.get_json()   
 
-        # Track original type
+        # Track original type (a type change allocates a new unique_code)
         old_type = member.member_type
+        old_code = member.unique_code
         new_type = data.get('member_type', member.member_type)
 
-        # Update general info
-        member.first_name = data.get('first_name', member.first_name)
-        member.last_name = data.get('last_name', member.last_name)
-        member.age = data.get('age', member.age)
-        member.gender = data.get('gender', member.gender)
-        member.gym_plan = data.get('gym_plan', member.gym_plan)
-        member.email = data.get('email', member.email)
-        member.contact_number = data.get('contact_number', member.contact_number)
-        member.address = data.get('address', member.address)
-        member.start_date = datetime.strptime(data.get('start_date'), '%Y-%m-%d').date()
-        member.end_date = datetime.strptime(data.get('end_date'), '%Y-%m-%d').date()
-        member.status = data.get('status', member.status)
-        member.payment_status = data.get('payment_status', member.payment_status)
-
-        # Handle type change
-        if new_type != old_type:
-            member.update_member_type(new_type)
-
-        # Auto-update status based on new end date
-        from pytz import timezone
-        tz = timezone("Asia/Manila")
-        current_date = datetime.now(tz).date()
-
-        member.status = data.get('status', member.status)
-        member.payment_status = data.get('payment_status', member.payment_status)
-
-        db.session.commit()
-
-        # Log edit
-        log = MembershipLog(
-            member_id=member.member_id,
-            action_type='Updated',
-            remarks=f"Updated information for {member.first_name} {member.last_name}."
-        )
-        db.session.add(log)
-        db.session.commit()
+        # --- Member update and its log in one transaction ---
+        with unit_of_work('members', 'renewals', 'payments'):
+            before = member_key(member)
+            was_paid = member.payment_status == 'Paid'
+
+            # Update general info
+            member.first_name = data.get('first_name', member.first_name)
+            member.last_name = data.get('last_name', member.last_name)
+            member.age = data.get('age', member.age)
+            member.gender = data.get('gender', member.gender)
+            member.gym_plan = data.get('gym_plan', member.gym_plan)
+            member.email = data.get('email', member.email)
+            member.contact_number = data.get('contact_number', member.contact_number)
+            member.address = data.get('address', member.address)
+            member.start_date = datetime.strptime(data.get('start_date'), '%Y-%m-%d').date()
+            member.end_date = datetime.strptime(data.get('end_date'), '%Y-%m-%d').date()
+            member.status = data.get('status', member.status)
+            member.payment_status = data.get('payment_status', member.payment_status)
+
+            # Handle type change
+            if new_type != old_type:
+                member.update_member_type(new_type)
+
+            # Marked Paid (from Unpaid/Overdue): that is when the revenue comes in
+            if member.payment_status == 'Paid' and not was_paid:
+                collect_payment(member, 'Payment')
+
+            record_change(member, before, 'Updated',
+                          f"Updated information for {member.first_name} {member.last_name}.")
+
+        # The kiosk must stop resolving the old code
+        if member.unique_code != old_code:
+            member_codes.forget(old_code)
+            member_codes.remember(member.unique_code, member.member_id)
 
         flash(f"Member {member.first_name} {member.last_name} was updated successfully!", "success")
 
@@ -259,17 +297,9 @@ def delete_member(member_id):
     # Get member ID from database
     member = Member.query.get_or_404(member_id)
     try:
-        db.session.delete(member)
-        db.session.commit()
-
-        # log membership
-        log = MembershipLog(
-            member_id=member_id,
-            action_type='Updated',
-            remarks=f"Deleted member record for {member.first_name} {member.last_name}."
-        )
-        db.session.add(log)
-        db.session.commit()
+        with unit_of_work('members', 'renewals', 'payments'):
+            remove_member(member)
+        member_codes.forget(member.unique_code)
 
         return jsonify({"success": True, "message": "Member deleted successfully!"})
 
@@ -278,35 +308,18 @@ def delete_member(member_id):
         return jsonify({"success": False, "error": str(e)}), 500
 
 @addMember.route('/admin/dashboard-summary', methods=['GET'])
+@cache.cached(tags=('members',), ttl=10)
+@read_only
 def dashboard_summary():
-    global _cache_data, _cache_time
-
-    now_time = time.time()
-
-    # Auto-expire members before calculations
-    auto_update_expired_members()
-
-    # Cache valid for 10 seconds
-    if _cache_data and now_time - _cache_time < 10:
-        return jsonify(_cache_data)
-
     try:
         tz = pytz.timezone("Asia/Manila")
         now = datetime.now(tz)
 
         # === SUMMARY ===
-        status_counts = dict(
-            db.session.query(Member.status, func.count(Member.member_id))
-            .group_by(Member.status)
-            .all()
-        )
+        status_counts = dict(Member.count_by(Member.status).all())
 
-        active_counts = dict(
-            db.session.query(Member.member_type, func.count(Member.member_id))
-            .filter(Member.status == "Active")
-            .group_by(Member.member_type)
-            .all()
-        )
+        # Active per type: running total of the daily_stats rollup
+        active_counts = active_by_type()
 
         total_members = sum(status_counts.values())
         active_members = status_counts.get("Active", 0)
@@ -319,46 +332,13 @@ def dashboard_summary():
 
         most_active_type = max(type_counts, key=type_counts.get) if active_members > 0 else "N/A"
 
-        # === 6-MONTH CHART ===
-        monthly_labels = []
-        student_counts = []
-        faculty_counts = []
-        outsider_counts = []
-
-        for i in range(5, -1, -1):
-            month = now.month - i
-            year = now.year
-
-            if month <= 0:
-                month += 12
-                year -= 1
-
-            label = datetime(year, month, 1).strftime("%b")
-            monthly_labels.append(label)
-
-            start = tz.localize(datetime(year, month, 1))
-            end_day = calendar.monthrange(year, month)[1]
-            end = tz.localize(datetime(year, month, end_day, 23, 59, 59))
-
-            # Safely handle NULL start/end
-            base_filter = and_(
-                Member.status == "Active",
-                Member.start_date != None,
-                Member.end_date != None,
-                Member.start_date <= end,
-                Member.end_date >= start
-            )
-
-            counts = dict(
-                db.session.query(Member.member_type, func.count(Member.member_id))
-                .filter(base_filter)
-                .group_by(Member.member_type)
-                .all()
-            )
-
-            student_counts.append(counts.get("Student", 0))
-            faculty_counts.append(counts.get("Faculty", 0))
-            outsider_counts.append(counts.get("Outsider", 0))
+        # === 6-MONTH CHART (Active members per month) ===
+        buckets = month_buckets(now, 6)
+        monthly_labels = [datetime(year, month, 1).strftime("%b") for year, month in buckets]
+        active_series = active_by_month(buckets, ["Student", "Faculty", "Outsider"])
+        student_counts = active_series["Student"]
+        faculty_counts = active_series["Faculty"]
+        outsider_counts = active_series["Outsider"]
 
         result = {
             "summary": {
@@ -390,20 +370,115 @@ def dashboard_summary():
             }
         }
 
-        # Store cache
-        _cache_data = result
-        _cache_time = now_time
-
         return jsonify(result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-# Get all members as JSON (for members.js use)
+# Keyset pagination for /admin/members-json: whitelisted sort keys, each
+# backed by an index whose ties are broken by member_id.
+MEMBER_SORT_KEYS = {
+    "member_id": Member.member_id,
+    "unique_code": Member.unique_code,
+    "last_name": Member.last_name,
+    "date_registered": Member.date_registered,
+    "start_date": Member.start_date,
+    "end_date": Member.end_date
+}
+MEMBER_FILTERS = {
+    "status": (Member.status, ("Active", "Inactive", "Expired")),
+    "member_type": (Member.member_type, ("Student", "Faculty", "Outsider")),
+    "gym_plan": (Member.gym_plan, ("Daily", "Monthly", "Annual"))
+}
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor, column):
+    """Return (sort value, member_id) from a cursor produced by encode_cursor."""
+    value, member_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if value is not None and isinstance(column.type, db.DateTime):
+        value = datetime.fromisoformat(value)
+    elif value is not None and isinstance(column.type, db.Date):
+        value = datetime.strptime(value, "%Y-%m-%d").date()
+    return value, int(member_id)
+
+# One /admin/members-json page (limit + 1 rows, to tell if there is more).
+# Raises ValueError / TypeError / binascii.Error on a bad filter or cursor.
+def members_page_query(args, sort, order, limit):
+    sort_column = MEMBER_SORT_KEYS[sort]
+    query = db.session.query(
+        Member.member_id, Member.unique_code, Member.first_name, Member.last_name,
+        Member.member_type, Member.gym_plan, Member.status, Member.payment_status,
+        Member.email, Member.contact_number, Member.start_date, Member.end_date,
+        Member.date_registered
+    )
+
+    for name, (column, allowed) in MEMBER_FILTERS.items():
+        value = args.get(name)
+        if value:
+            if value not in allowed:
+                raise ValueError(f"Invalid {name}.")
+            query = query.filter(column == value)
+
+    # Unique code prefix search stays on the unique index (no leading wildcard)
+    code = args.get("code", "").strip().upper()
+    if code:
+        query = query.filter(Member.unique_code >= code, Member.unique_code < code + "\uffff")
+
+    # Registration date range, inclusive of both days
+    if args.get("date_from"):
+        query = query.filter(Member.date_registered >= datetime.strptime(args["date_from"], "%Y-%m-%d"))
+    if args.get("date_to"):
+        end = datetime.strptime(args["date_to"], "%Y-%m-%d") + timedelta(days=1)
+        query = query.filter(Member.date_registered < end)
+
+    if args.get("cursor"):
+        value, last_id = decode_cursor(args["cursor"], sort_column)
+        if sort == "member_id":
+            query = query.filter(Member.member_id > last_id if order == "asc" else Member.member_id < last_id)
+        else:
+            position = tuple_(sort_column, Member.member_id)
+            query = query.filter(position > (value, last_id) if order == "asc" else position < (value, last_id))
+
+    if sort == "member_id":
+        ordering = [Member.member_id.asc() if order == "asc" else Member.member_id.desc()]
+    elif order == "asc":
+        ordering = [sort_column.asc(), Member.member_id.asc()]
+    else:
+        ordering = [sort_column.desc(), Member.member_id.desc()]
+
+    return query.order_by(*ordering).limit(limit + 1)
+
+# Get members as JSON, one page at a time (for members.js / tables.js use)
+# ?status=&member_type=&gym_plan=&code=&date_from=&date_to=&sort=&order=&limit=&cursor=
 @addMember.route('/admin/members-json', methods=['GET'])
+@cache.cached(tags=('members',), ttl=30)
 def get_members_json():
-    members = Member.query.all()
+    args = request.args
+    sort = args.get("sort", "member_id")
+    order = args.get("order", "asc")
+    limit = min(max(args.get("limit", 25, type=int), 1), 100)
+
+    if sort not in MEMBER_SORT_KEYS or order not in ("asc", "desc"):
+        return jsonify({"success": False, "error": "Invalid sort or order."}), 400
+
+    try:
+        query = members_page_query(args, sort, order, limit)
+    except (ValueError, TypeError, binascii.Error) as e:
+        return jsonify({"success": False, "error": f"Invalid filter or cursor: {e}"}), 400
+
+    rows = query.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, sort), last.member_id])
+
     return jsonify({
         "members": [
             {
@@ -414,16 +489,20 @@ def get_members_json():
                 "member_type": m.member_type,
                 "gym_plan": m.gym_plan,
                 "status": m.status,
+                "payment_status": m.payment_status,
                 "email": m.email,
                 "contact_number": m.contact_number,
                 "start_date": m.start_date.strftime("%Y-%m-%d"),
                 "end_date": m.end_date.strftime("%Y-%m-%d")
             }
-            for m in members
-        ]
+            for m in rows
+        ],
+        "next_cursor": next_cursor,
+        "has_more": has_more
     })
 
 @addMember.route("/admin/renewals-json")
+@cache.cached(tags=('renewals', 'members'))
 def renewals_json():
     requests = RenewalRequest.query.all()
 
@@ -457,68 +536,67 @@ def handle_renewal_request(request_id):
         return jsonify({"success": False, "message": "Request or member not found"})
 
     try:
-        renewal_request.status = status
-        member = renewal_request.member
-
-        if status == 'Approved':
-            member.gym_plan = renewal_request.requested_plan
-            member.status = "Active"
-            member.payment_status = "Paid"
-
-            from datetime import timedelta
-            tz = pytz.timezone("Asia/Manila")
-            today = datetime.now(tz).date()
-            member.start_date = today
-
-            # IMPORTANT: This line makes statistics update!
-            member.last_payment_date = datetime.now(pytz.timezone('Asia/Manila'))
-
-            # Fetch pricing
-            plan_info = GymPricing.query.filter_by(
-                member_type=member.member_type,
-                plan_type=renewal_request.requested_plan
-            ).first()
-
-            requested_plan = renewal_request.requested_plan
-
-            # Duration logic
-            if requested_plan == "Daily":
-                duration = 1
-            elif requested_plan == "Monthly":
-                duration = 30
-            elif requested_plan == "Annual":
-                duration = 365
-            else:
-                duration = 30
-
-            member.end_date = today + timedelta(days=duration)
-            member.price_paid = plan_info.price if plan_info else 0.0
-
-            # Log
-            log = MembershipLog(
-                member_id=member.member_id,
-                action_type='Renewal Approved',
-                remarks=f"Renewal approved. Plan updated to {member.gym_plan}, payment status {member.payment_status}."
-            )
-            db.session.add(log)
+        with unit_of_work('renewals', 'members', 'payments'):
+            renewal_request.status = status
+            member = renewal_request.member
+            before = member_key(member)
+
+            if status == 'Approved':
+                now = datetime.now(pytz.timezone('Asia/Manila'))
+                requested_plan = renewal_request.requested_plan
+                renew(member, requested_plan, now, prices.price(member.member_type, requested_plan, now.date()))
+                payment = Payment.for_member(member, 'Renewal', paid_at=member.last_payment_date)
+                db.session.add(payment)
+                record_payment(payment)
+                record_change(
+                    member, before, 'Renewal Approved',
+                    f"Renewal approved. Plan updated to {member.gym_plan}, payment status {member.payment_status}."
+                )
+
+            elif status == 'Denied':
+                audit(member, 'Renewal Denied', f"Renewal request for {renewal_request.requested_plan} plan denied.")
 
-
-        elif status == 'Denied':
-            log = MembershipLog(
-                member_id=member.member_id,
-                action_type='Renewal Denied',
-                remarks=f"Renewal request for {renewal_request.requested_plan} plan denied."
-            )
-            db.session.add(log)
-
-        db.session.commit()
         return jsonify({"success": True, "message": f"Renewal request {status.lower()} successfully."})
 
     except Exception as e:
         db.session.rollback()
         return jsonify({"success": False, "message": str(e)})
 
-    
+
+# ADMIN: Approve / deny many renewal requests at once
+# POST /admin/renewals/bulk {"request_ids": [...], "status": "Approved" | "Denied"}
+MAX_BULK_RENEWALS = 500
+
+@addMember.route('/admin/renewals/bulk', methods=['POST'])
+def bulk_renewal_requests():
+    data = request.get_json(silent=True) or {}
+    status = data.get('status')
+    request_ids = data.get('request_ids')
+
+    if status not in ['Approved', 'Denied']:
+        return jsonify({"success": False, "message": "Invalid status"}), 400
+    if (not isinstance(request_ids, list) or not request_ids
+            or not all(isinstance(request_id, int) and not isinstance(request_id, bool) for request_id in request_ids)):
+        return jsonify({"success": False, "message": "request_ids must be a non-empty list of IDs."}), 400
+    request_ids = list(dict.fromkeys(request_ids))
+    if len(request_ids) > MAX_BULK_RENEWALS:
+        return jsonify({"success": False, "message": f"At most {MAX_BULK_RENEWALS} requests per call."}), 400
+
+    try:
+        with unit_of_work('renewals', 'members', 'payments'):
+            outcomes = decide_renewals(request_ids, status, datetime.now(pytz.timezone('Asia/Manila')))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    decided = sum(1 for outcome in outcomes.values() if outcome in ('approved', 'denied'))
+    return jsonify({
+        "success": True,
+        "message": f"{decided} of {len(request_ids)} renewal requests {status.lower()}.",
+        "results": [{"request_id": request_id, "result": outcomes[request_id]} for request_id in request_ids]
+    })
+
+
 @addMember.route('/admin/renewal/delete/<int:request_id>', methods=['DELETE'])
 def delete_renewal_request(request_id):
     renewal_request = RenewalRequest.query.get(request_id)
@@ -528,6 +606,7 @@ def delete_renewal_request(request_id):
     try:
         db.session.delete(renewal_request)
         db.session.commit()
+        cache.invalidate('renewals')
         return jsonify({"success": True})
     except Exception as e:
         db.session.rollback()
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
 from . import db    
 from .models import Admin
 
@@ -32,4 +32,12 @@ def admin_login():
 def admin_logout():
     session.pop('admin_id', None)
     flash('You have been logged out.', 'info')
-    return redirect(url_for('adminAuth.admin_login'))
\ No newline at end of file
+    return redirect(url_for('adminAuth.admin_login'))
+
+# ========================================
+# ADMIN-ONLY API BLUEPRINTS
+# ========================================
+def require_admin():
+    """before_request hook: 401 unless an admin is logged in (same check as the admin pages)."""
+    if 'admin_id' not in session:
+        return jsonify({"success": False, "error": "Admin login required."}), 401
@@ -0,0 +1,220 @@
+from flask import Blueprint, request, jsonify
+from . import db
+from .adminAuth import require_admin
+from .cache import cache
+from .models import AttendanceLog
+from .storage import use_read_only
+from datetime import datetime, timedelta
+from sqlalchemy import func
+import calendar
+import pytz
+
+try:
+    import numpy as np
+except ImportError:  # optional: the endpoint reports that it is unavailable
+    np = None
+
+analytics = Blueprint('analytics', __name__)
+analytics.before_request(require_admin)
+analytics.before_request(use_read_only)
+
+GRANULARITIES = (15, 30, 60)  # minutes per heatmap slot
+DWELL_EDGES = (0, 15, 30, 45, 60, 90, 120, 180)  # minutes; the last bin is open-ended
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+CHUNK_ROWS = 20000
+MAX_RANGE_DAYS = 731
+TOP_PEAK_DAYS = 10
+
+
+# ========================================
+# LOADING (straight into datetime64 arrays)
+# ========================================
+def sessions_statement(date_from, date_to):
+    # Read as text: numpy parses the ISO strings, and 'NaT' instead of NULL
+    # keeps it off the slow object path
+    return (
+        db.select(db.cast(AttendanceLog.time_in, db.String),
+                  func.coalesce(db.cast(AttendanceLog.time_out, db.String), 'NaT'))
+        .where(AttendanceLog.date >= date_from, AttendanceLog.date <= date_to,
+               AttendanceLog.time_in.is_not(None))
+    )
+
+
+def minutes_statement(date_from, date_to):
+    # SQLite: every session as whole minutes since date_from, concatenated into
+    # one comma-separated string per column (one row back instead of one per
+    # session). Both group_concats walk the same rows, so the lists line up;
+    # an open session's time_out is -1 (group_concat would skip NULL).
+    # strftime('%s') reads the stored naive text as UTC, like timegm below.
+    start = calendar.timegm(date_from.timetuple())
+
+    def minutes(column):
+        return (func.strftime('%s', column, type_=db.Integer) - start) // 60
+
+    return (
+        db.select(func.group_concat(minutes(AttendanceLog.time_in)),
+                  func.group_concat(func.coalesce(minutes(AttendanceLog.time_out), -1)))
+        .where(AttendanceLog.date >= date_from, AttendanceLog.date <= date_to,
+               AttendanceLog.time_in.is_not(None))
+    )
+
+
+def load_sessions(date_from, date_to):
+    """(time_in, time_out) datetime64[m] arrays for checked-in rows in the
+    range; time_out is NaT where the member never timed out."""
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        ins, outs = connection.execute(minutes_statement(date_from, date_to)).one()
+        start = np.datetime64(date_from, 'm')
+        time_in = start + np.fromstring(ins or '', dtype=np.int64, sep=',').astype('timedelta64[m]')
+        time_out = np.fromstring(outs or '', dtype=np.int64, sep=',')
+        return time_in, np.where(time_out < 0, np.datetime64('NaT'), start + time_out.astype('timedelta64[m]'))
+
+    # Other databases: drained straight from the DBAPI cursor in chunks, so
+    # no Row or datetime objects are built per record
+    result = connection.execute(sessions_statement(date_from, date_to))
+    ins, outs = [], []
+    try:
+        while chunk := result.cursor.fetchmany(CHUNK_ROWS):
+            time_in, time_out = zip(*chunk)
+            ins.append(np.array(time_in, dtype='datetime64[s]').astype('datetime64[m]'))
+            outs.append(np.array(time_out, dtype='datetime64[s]').astype('datetime64[m]'))
+    finally:
+        result.close()
+
+    if not ins:
+        return np.array([], dtype='datetime64[m]'), np.array([], dtype='datetime64[m]')
+    return np.concatenate(ins), np.concatenate(outs)
+
+
+# ========================================
+# ANALYSIS (vectorized; minutes since the start of the range)
+# ========================================
+def analyze(time_in, time_out, date_from, date_to, slot_minutes, now):
+    """Heatmap, dwell-time distribution and concurrency peaks for one range.
+
+    Sessions still open today count as present until `now`; open sessions
+    from earlier days (never timed out) only count as arrivals.
+    """
+    days = (date_to - date_from).days + 1
+    slots_per_day = 1440 // slot_minutes
+    total_slots = days * slots_per_day
+    start = np.datetime64(date_from, 'm')
+
+    open_today = np.isnat(time_out) & (time_in.astype('datetime64[D]') == np.datetime64(now.date(), 'D'))
+    time_out = np.where(open_today, np.datetime64(now, 'm'), time_out)
+    closed = ~np.isnat(time_out) & (time_out >= time_in)
+
+    arrive = (time_in - start).astype(np.int64)
+    first_weekday = date_from.weekday()
+
+    # Arrivals per (weekday, slot of day)
+    arrival_weekday = (first_weekday + arrive // 1440) % 7
+    arrival_slot = (arrive % 1440) // slot_minutes
+    arrivals = np.bincount(arrival_weekday * slots_per_day + arrival_slot,
+                           minlength=7 * slots_per_day).reshape(7, slots_per_day)
+
+    # Members present in each slot of the range (difference array + cumsum),
+    # averaged over the days of each weekday
+    enter = arrive[closed]
+    leave = (time_out[closed] - start).astype(np.int64)
+    first_slot = enter // slot_minutes
+    last_slot = np.minimum(leave // slot_minutes, total_slots - 1)
+    delta = (np.bincount(first_slot, minlength=total_slots + 1)
+             - np.bincount(last_slot + 1, minlength=total_slots + 1))
+    present = np.cumsum(delta[:total_slots]).reshape(days, slots_per_day)
+
+    day_weekdays = (first_weekday + np.arange(days)) % 7
+    occupancy = np.zeros((7, slots_per_day))
+    np.add.at(occupancy, day_weekdays, present)
+    occupancy /= np.maximum(np.bincount(day_weekdays, minlength=7), 1)[:, None]
+
+    # Dwell times of finished sessions
+    dwell = (leave - enter)[~open_today[closed]]
+    counts, _ = np.histogram(dwell, bins=[*DWELL_EDGES, np.inf])
+
+    return {
+        "range": {"date_from": date_from.isoformat(), "date_to": date_to.isoformat(), "days": days},
+        "granularity": slot_minutes,
+        "sessions": int(time_in.size),
+        "open_sessions": int(np.isnat(time_out).sum()),
+        "heatmap": {
+            "weekdays": list(WEEKDAYS),
+            "slots": [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(0, 1440, slot_minutes)],
+            "average_occupancy": np.round(occupancy, 2).tolist(),
+            "arrivals": arrivals.tolist()
+        },
+        "dwell": {
+            "bins": [f"{low}-{high}" for low, high in zip(DWELL_EDGES, DWELL_EDGES[1:])] + [f"{DWELL_EDGES[-1]}+"],
+            "counts": counts.tolist(),
+            "mean_minutes": round(float(dwell.mean()), 1) if dwell.size else None,
+            "median_minutes": round(float(np.median(dwell)), 1) if dwell.size else None,
+            "p90_minutes": round(float(np.percentile(dwell, 90)), 1) if dwell.size else None
+        },
+        "peaks": _peaks(enter, leave, date_from, days)
+    }
+
+
+def _peaks(enter, leave, date_from, days):
+    """Exact concurrent occupancy: overall maximum and the busiest days."""
+    if not enter.size:
+        return {"max": None, "days": []}
+
+    times = np.concatenate([enter, leave])
+    steps = np.concatenate([np.ones(enter.size, np.int64), -np.ones(leave.size, np.int64)])
+    order = np.argsort(times * 2 + (steps > 0))  # at equal times, check-outs first
+    times, level = times[order], np.cumsum(steps[order])
+
+    # Highest level per day (days are contiguous once sorted by time), at
+    # the earliest minute it was reached
+    day = np.minimum(times // 1440, days - 1)
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    day_max = np.maximum.reduceat(level, starts)
+    hits = np.flatnonzero(level == np.repeat(day_max, np.diff(np.r_[starts, level.size])))
+    best = hits[np.r_[True, day[hits][1:] != day[hits][:-1]]]
+    best = best[np.argsort(-level[best], kind='stable')][:TOP_PEAK_DAYS]
+
+    def at(index):
+        return {
+            "count": int(level[index]),
+            "at": (datetime.combine(date_from, datetime.min.time())
+                   + timedelta(minutes=int(times[index]))).strftime("%Y-%m-%d %H:%M")
+        }
+
+    return {"max": at(best[0]), "days": [at(index) for index in best]}
+
+
+# ========================================
+# ADMIN: ATTENDANCE ANALYTICS
+# /admin/analytics/attendance?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&granularity=15|30|60
+# ========================================
+def _parse_day(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        raise ValueError(f"{name} must be YYYY-MM-DD.")
+
+
+@analytics.route('/admin/analytics/attendance', methods=['GET'])
+@cache.cached(tags=('attendance',), ttl=300)
+def attendance_analytics():
+    if np is None:
+        return jsonify({"success": False, "error": "Attendance analytics requires the numpy package."}), 503
+
+    now = datetime.now(pytz.timezone('Asia/Manila')).replace(tzinfo=None)
+    try:
+        date_to = _parse_day(request.args.get('date_to'), 'date_to') or now.date()
+        date_from = _parse_day(request.args.get('date_from'), 'date_from') or date_to - timedelta(days=29)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    granularity = request.args.get('granularity', 60, type=int)
+    if granularity not in GRANULARITIES:
+        return jsonify({"success": False, "error": "granularity must be 15, 30 or 60."}), 400
+    if date_from > date_to:
+        return jsonify({"success": False, "error": "date_from must not be after date_to."}), 400
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        return jsonify({"success": False, "error": f"Range is limited to {MAX_RANGE_DAYS} days."}), 400
+
+    time_in, time_out = load_sessions(date_from, date_to)
+    return jsonify(analyze(time_in, time_out, date_from, date_to, granularity, now))
@@ -0,0 +1,70 @@
+from . import db
+from .models import AttendanceLog
+from .rollups import _insert, record_check_in, record_attendance_day
+from .activity import mark_day
+from .live import queue_event
+
+
+# ========================================
+# CHECK-IN / CHECK-OUT (one statement each, caller commits)
+# ========================================
+def time_in_upsert(member_id, now):
+    """The INSERT ... ON CONFLICT behind time_in (one row per member per day)."""
+    stmt = _insert(AttendanceLog).values(member_id=member_id, date=now.date(), time_in=now)
+    return stmt.on_conflict_do_update(
+        index_elements=['member_id', 'date'],
+        set_={'time_in': stmt.excluded.time_in},
+        where=AttendanceLog.time_in.is_(None)
+    ).returning(AttendanceLog.attendance_id)
+
+
+def time_in(member_id, now):
+    """Record today's time-in with one upsert; False if already timed in.
+
+    Relies on the unique (member_id, date) index: a concurrent double tap
+    hits ON CONFLICT and only the first request gets a row back.
+    """
+    today = now.date()
+    if db.session.execute(time_in_upsert(member_id, now)).first() is None:
+        return False
+
+    record_check_in(member_id, today)
+    record_attendance_day(member_id)
+    mark_day(member_id, 'attendance', today)
+    queue_event('check_in', {"member_id": member_id, "time_in": now})
+    return True
+
+
+def time_out_update(member_id, now):
+    """The conditional UPDATE behind time_out (one open session per member per day)."""
+    return (
+        db.update(AttendanceLog)
+        .where(
+            AttendanceLog.member_id == member_id,
+            AttendanceLog.date == now.date(),
+            AttendanceLog.time_in.is_not(None),
+            AttendanceLog.time_out.is_(None)
+        )
+        .values(time_out=now)
+        .returning(AttendanceLog.attendance_id)
+    )
+
+
+def time_out(member_id, now):
+    """Record today's time-out with one conditional UPDATE.
+
+    Returns 'ok', or on failure 'not_in' / 'already_out' (only the failure
+    path reads the row to tell the two apart).
+    """
+    today = now.date()
+    updated = db.session.execute(time_out_update(member_id, now)).first()
+    if updated is not None:
+        queue_event('check_out', {"member_id": member_id, "time_out": now})
+        return 'ok'
+
+    timed_out = db.session.execute(
+        db.select(AttendanceLog.time_out)
+        .where(AttendanceLog.member_id == member_id, AttendanceLog.date == today,
+               AttendanceLog.time_in.is_not(None))
+    ).first()
+    return 'not_in' if timed_out is None else 'already_out'
@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, make_response, request
+
+
+# ========================================
+# IN-MEMORY BACKEND (per process)
+# ========================================
+class MemoryBackend:
+    """Bounded LRU map of key -> (expires_at, tags, value), safe across threads."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, tags, value = entry
+            if expires_at < time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tags):
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.time() + ttl, tuple(tags), value)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+# ========================================
+# SQLITE BACKEND (shared by worker processes)
+# ========================================
+class SQLiteBackend:
+    """Same contract as MemoryBackend, stored in a local SQLite file so every
+    worker process on the host sees the same entries and invalidations."""
+
+    def __init__(self, path, max_entries=512):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_entries ("
+                     "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                     "expires_at REAL NOT NULL, last_used REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_last_used ON cache_entries (last_used)")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_tags ("
+                     "tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_tags_key ON cache_tags (key)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute("SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            self._delete_keys(conn, [key])
+            return None
+        conn.execute("UPDATE cache_entries SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key, value, ttl, tags):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO cache_entries (key, value, expires_at, last_used) "
+                         "VALUES (?, ?, ?, ?)", (key, value, now + ttl, now))
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+            conn.executemany("INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)",
+                             [(tag, key) for tag in tags])
+
+            overflow = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                stale = [r[0] for r in conn.execute(
+                    "SELECT key FROM cache_entries ORDER BY last_used LIMIT ?", (overflow,))]
+                self._delete_keys(conn, stale)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def invalidate_tags(self, tags):
+        conn = self._connection()
+        placeholders = ",".join("?" * len(tags))
+        keys = [r[0] for r in conn.execute(
+            f"SELECT DISTINCT key FROM cache_tags WHERE tag IN ({placeholders})", tuple(tags))]
+        self._delete_keys(conn, keys)
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_tags")
+
+    @staticmethod
+    def _delete_keys(conn, keys):
+        if not keys:
+            return
+        params = [(key,) for key in keys]
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", params)
+        conn.executemany("DELETE FROM cache_tags WHERE key = ?", params)
+
+
+# ========================================
+# RESPONSE CACHE (Flask extension)
+# ========================================
+class ResponseCache:
+    """Caches successful JSON responses of GET routes, keyed by path + query string.
+
+    Entries carry tags ('members', 'renewals', 'payments', 'pricing',
+    'attendance'); writes call invalidate() with the tags they affect.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self._listeners = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', os.environ.get('CACHE_BACKEND', 'memory'))
+        app.config.setdefault('CACHE_MAX_ENTRIES', int(os.environ.get('CACHE_MAX_ENTRIES', 512)))
+        app.config.setdefault('CACHE_DEFAULT_TTL', int(os.environ.get('CACHE_DEFAULT_TTL', 60)))
+        app.config.setdefault('CACHE_SQLITE_PATH', os.environ.get(
+            'CACHE_SQLITE_PATH', os.path.join(app.instance_path, 'response_cache.db')))
+
+        if app.config['CACHE_BACKEND'] == 'sqlite':
+            os.makedirs(os.path.dirname(app.config['CACHE_SQLITE_PATH']), exist_ok=True)
+            self.backend = SQLiteBackend(app.config['CACHE_SQLITE_PATH'], app.config['CACHE_MAX_ENTRIES'])
+        else:
+            self.backend = MemoryBackend(app.config['CACHE_MAX_ENTRIES'])
+        app.extensions['response_cache'] = self
+
+    def cached(self, tags, ttl=None):
+        """Decorator for JSON GET views; only 200 JSON responses are stored."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = f"{request.path}?{request.query_string.decode()}"
+                hit = self.backend.get(key)
+                if hit is not None:
+                    return Response(hit, mimetype='application/json')
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and response.is_json:
+                    self.backend.set(
+                        key, response.get_data(as_text=True),
+                        ttl or current_app.config['CACHE_DEFAULT_TTL'], tags
+                    )
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tags):
+        if self.backend is not None and tags:
+            self.backend.invalidate_tags(tags)
+        for listener in self._listeners:
+            listener(tags)
+
+    def on_invalidate(self, listener):
+        """Call listener(tags) after every invalidate(), e.g. to push live updates."""
+        self._listeners.append(listener)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+
+cache = ResponseCache()
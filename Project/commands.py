@@ -0,0 +1,166 @@
+import click
+from flask.cli import with_appcontext
+
+
+# ========================================
+# ROLLUP MAINTENANCE
+# ========================================
+@click.command('rebuild-daily-stats')
+@with_appcontext
+def rebuild_daily_stats_command():
+    """Recompute the daily_stats rollup from members, payments and attendance."""
+    from .rollups import rebuild_daily_stats
+
+    rows = rebuild_daily_stats()
+    click.echo(f"Rebuilt daily_stats: {rows} rows.")
+
+
+@click.command('rebuild-member-stats')
+@with_appcontext
+def rebuild_member_stats_command():
+    """Recompute the per-member dashboard counters from workouts and attendance."""
+    from .rollups import rebuild_member_stats
+
+    rows = rebuild_member_stats()
+    click.echo(f"Rebuilt member_stats: {rows} rows.")
+
+
+@click.command('rebuild-activity-calendars')
+@with_appcontext
+def rebuild_activity_calendars_command():
+    """Recompute the workout and attendance day bitmaps."""
+    from .activity import rebuild_activity_calendars
+
+    rows = rebuild_activity_calendars()
+    click.echo(f"Rebuilt activity_calendars: {rows} rows.")
+
+
+# ========================================
+# MEMBERSHIP EXPIRY (cron-friendly)
+# ========================================
+@click.command('expire-members')
+@with_appcontext
+def expire_members_command():
+    """Mark lapsed memberships as expired and record the run in job_runs."""
+    from .scheduler import run_expiry_sweep
+
+    result = run_expiry_sweep()
+    click.echo(
+        f"Expired {result['expired']} members ({result['logged']} logs) "
+        f"in {result['batches']} batches, {result['elapsed_ms']} ms."
+    )
+
+
+# ========================================
+# BULK MEMBER IMPORT
+# ========================================
+@click.command('import-members')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=200, show_default=True, help='Rows per transaction.')
+@with_appcontext
+def import_members_command(path, batch_size):
+    """Import members from a CSV or XLSX file, streaming it row by row."""
+    from .memberImport import import_members, iter_rows
+
+    with open(path, 'rb') as stream:
+        report = import_members(iter_rows(stream, path), batch_size)
+
+    for error in report["errors"]:
+        click.echo(f"Row {error['row']}: {'; '.join(error['errors'])}", err=True)
+    if report.get("errors_truncated"):
+        click.echo(f"(only the first {len(report['errors'])} row errors are listed)", err=True)
+    if report.get("read_error"):
+        read_error = report["read_error"]
+        click.echo(f"Stopped: could not read row {read_error['row']}: {read_error['error']}", err=True)
+    click.echo(f"Imported {report['imported']} members in {report['batches']} batches, {report['failed']} rows failed.")
+
+
+# ========================================
+# STREAMING DATA EXPORT
+# ========================================
+@click.command('export-data')
+@click.argument('dataset', type=click.Choice(['members', 'membership_logs', 'attendance', 'workouts']))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default='csv', show_default=True)
+@click.option('--columns', default='', help='Comma-separated column names (default: all).')
+@click.option('--from', 'date_from', type=click.DateTime(['%Y-%m-%d']), help='First day (inclusive).')
+@click.option('--to', 'date_to', type=click.DateTime(['%Y-%m-%d']), help='Last day (inclusive).')
+@click.option('--gzip', 'compress', is_flag=True, help='Compress the output with gzip.')
+@click.option('-o', '--output', type=click.File('wb'), default='-', help='Output file (default: stdout).')
+@with_appcontext
+def export_data_command(dataset, fmt, columns, date_from, date_to, compress, output):
+    """Stream a dataset as CSV or NDJSON with flat memory use."""
+    from .exports import stream_export
+
+    try:
+        chunks = stream_export(
+            dataset, fmt,
+            [name.strip() for name in columns.split(',') if name.strip()],
+            date_from.date() if date_from else None,
+            date_to.date() if date_to else None,
+            compress
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    for chunk in chunks:
+        output.write(chunk)
+
+
+# ========================================
+# PRICING
+# ========================================
+@click.command('reprice-payments')
+@with_appcontext
+def reprice_payments_command():
+    """Report payments that differ from the price in force on the day they were made."""
+    from .pricing import reprice_payments
+
+    report = reprice_payments()
+    click.echo(f"Checked {report['checked']} payments: {report['mismatched']} differ "
+               f"from the price table by ₱{report['difference']:.2f} in total.")
+    for payment in report['payments']:
+        click.echo(f"  #{payment['payment_id']} {payment['paid_at']:%Y-%m-%d %H:%M}: "
+                   f"₱{payment['amount']:.2f}, table ₱{payment['expected']:.2f}")
+    if report['mismatched'] > len(report['payments']):
+        click.echo(f"  ... and {report['mismatched'] - len(report['payments'])} more")
+
+
+# ========================================
+# INDEX REGRESSION CHECK
+# ========================================
+@click.command('check-query-plans')
+@click.option('--verbose', '-v', is_flag=True, help='Print every plan, not only failures.')
+@with_appcontext
+def check_query_plans_command(verbose):
+    """EXPLAIN QUERY PLAN the hot route queries; exit 1 if one scans a whole table."""
+    from . import db
+    from .queryplans import check_query_plans
+
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException("check-query-plans only supports SQLite (EXPLAIN QUERY PLAN).")
+
+    failures = 0
+    for name, plan, scans in check_query_plans():
+        if scans:
+            failures += 1
+        if scans or verbose:
+            click.echo(f"{'FAIL' if scans else 'ok  '} {name}")
+            for line in plan:
+                click.echo(f"       {line}")
+        else:
+            click.echo(f"ok   {name}")
+
+    if failures:
+        raise click.ClickException(f"{failures} hot queries fall back to a full table scan.")
+    click.echo("All hot queries use an index.")
+
+
+def register_commands(app):
+    app.cli.add_command(rebuild_daily_stats_command)
+    app.cli.add_command(rebuild_member_stats_command)
+    app.cli.add_command(rebuild_activity_calendars_command)
+    app.cli.add_command(expire_members_command)
+    app.cli.add_command(import_members_command)
+    app.cli.add_command(export_data_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(reprice_payments_command)
@@ -0,0 +1,147 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from . import db
+from .adminAuth import require_admin
+from .models import Member, MembershipLog, AttendanceLog, Workout
+from .storage import use_read_only
+from datetime import datetime, date, timedelta
+import csv
+import io
+import json
+import zlib
+
+exports = Blueprint('exports', __name__)
+exports.before_request(require_admin)
+
+# dataset -> (model, date column used for ranges, primary key for ordering)
+DATASETS = {
+    'members': (Member, Member.date_registered, Member.member_id),
+    'membership_logs': (MembershipLog, MembershipLog.action_date, MembershipLog.log_id),
+    'attendance': (AttendanceLog, AttendanceLog.date, AttendanceLog.attendance_id),
+    'workouts': (Workout, Workout.workout_date, Workout.workout_id)
+}
+# Never exported
+HIDDEN_COLUMNS = {'password_hash'}
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+ROWS_PER_CHUNK = 500
+
+
+def export_columns(dataset):
+    model = DATASETS[dataset][0]
+    return [column.name for column in model.__table__.columns if column.name not in HIDDEN_COLUMNS]
+
+
+def build_export_query(dataset, columns=None, date_from=None, date_to=None):
+    """Core SELECT for a dataset; raises ValueError on unknown columns."""
+    model, date_column, order_column = DATASETS[dataset]
+    allowed = export_columns(dataset)
+    columns = columns or allowed
+    unknown = [name for name in columns if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown columns for {dataset}: {', '.join(unknown)}")
+
+    table = model.__table__
+    stmt = db.select(*[table.c[name] for name in columns]).order_by(order_column)
+
+    # Inclusive day range on the dataset's date column
+    is_datetime = isinstance(date_column.type, db.DateTime)
+    if date_from:
+        stmt = stmt.where(date_column >= (datetime.combine(date_from, datetime.min.time()) if is_datetime else date_from))
+    if date_to:
+        if is_datetime:
+            stmt = stmt.where(date_column < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+        else:
+            stmt = stmt.where(date_column <= date_to)
+    return stmt, columns
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    return value
+
+
+def _encode_chunks(rows, columns, fmt):
+    """Yield text chunks of ROWS_PER_CHUNK rows (CSV starts with a header line)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(columns)
+
+    count = 0
+    for row in rows:
+        if writer:
+            writer.writerow(['' if value is None else _plain(value) for value in row])
+        else:
+            buffer.write(json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False))
+            buffer.write('\n')
+        count += 1
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(dataset, fmt='csv', columns=None, date_from=None, date_to=None, compress=False):
+    """Generator of encoded bytes; rows come from a server-side cursor (yield_per)."""
+    stmt, columns = build_export_query(dataset, columns, date_from, date_to)
+
+    def generate():
+        # Runs after the view returns (stream_with_context gives it a fresh
+        # session), so the read-only opt-in happens here rather than on the route
+        use_read_only()
+        result = db.session.execute(stmt.execution_options(yield_per=1000))
+        gzip = zlib.compressobj(wbits=31) if compress else None  # wbits=31 -> gzip container
+        for chunk in _encode_chunks(result, columns, fmt):
+            data = chunk.encode('utf-8')
+            if gzip:
+                data = gzip.compress(data)
+            if data:
+                yield data
+        if gzip:
+            yield gzip.flush()
+        result.close()
+
+    return generate()
+
+
+def _parse_day(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        raise ValueError(f"{name} must be YYYY-MM-DD.")
+
+
+# ========================================
+# ADMIN: STREAMING EXPORTS
+# /admin/export/<dataset>?format=csv|ndjson&columns=a,b&date_from=&date_to=&gzip=1
+# ========================================
+@exports.route('/admin/export/<dataset>', methods=['GET'])
+def export_dataset(dataset):
+    if dataset not in DATASETS:
+        return jsonify({"success": False, "error": f"Unknown dataset. Choose one of: {', '.join(DATASETS)}."}), 404
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        return jsonify({"success": False, "error": "format must be csv or ndjson."}), 400
+
+    columns = [name.strip() for name in request.args.get('columns', '').split(',') if name.strip()]
+    compress = request.args.get('gzip', type=int) == 1
+    try:
+        body = stream_export(
+            dataset, fmt, columns,
+            _parse_day(request.args.get('date_from'), 'date_from'),
+            _parse_day(request.args.get('date_to'), 'date_to'),
+            compress
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    filename = f"{dataset}-{date.today().isoformat()}.{fmt}" + ('.gz' if compress else '')
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return Response(
+        stream_with_context(body),
+        mimetype='application/gzip' if compress else FORMATS[fmt],
+        headers=headers
+    )
@@ -0,0 +1,247 @@
+from flask import Blueprint, request, jsonify, session, current_app
+from . import db
+from .cache import cache
+from .models import Member, KioskEvent
+from .attendance import time_in, time_out
+from .rollups import _insert
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+import hmac
+import os
+import threading
+import pytz
+
+kiosk = Blueprint('kiosk', __name__)
+
+MAX_BATCH = 1000
+DIRECTIONS = ('in', 'out')
+
+
+# ========================================
+# UNIQUE CODE -> MEMBER ID MAP (per process)
+# ========================================
+class MemberCodeMap:
+    """In-memory unique_code -> member_id map, loaded on a miss.
+
+    A code changes only when an admin changes the member's type, and goes
+    away when the member is deleted; those routes forget the old code (and
+    remember the new one) after their commit. The map is per process.
+    """
+
+    def __init__(self):
+        self._codes = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, codes):
+        """{code: member_id} for the known codes; misses are loaded in one query."""
+        with self._lock:
+            found = {code: self._codes[code] for code in codes if code in self._codes}
+        missing = set(codes) - set(found)
+        if missing:
+            loaded = dict(
+                db.session.query(Member.unique_code, Member.member_id)
+                .filter(Member.unique_code.in_(missing))
+                .all()
+            )
+            with self._lock:
+                self._codes.update(loaded)
+            found.update(loaded)
+        return found
+
+    def remember(self, code, member_id):
+        with self._lock:
+            self._codes[code] = member_id
+
+    def forget(self, code):
+        with self._lock:
+            self._codes.pop(code, None)
+
+    def clear(self):
+        with self._lock:
+            self._codes.clear()
+
+
+member_codes = MemberCodeMap()
+
+
+# ========================================
+# BATCH PROCESSING
+# ========================================
+def _parse_event(event, now):
+    """(event dict, error) with the scan time as an aware Asia/Manila datetime."""
+    tz = pytz.timezone('Asia/Manila')
+    if not isinstance(event, dict):
+        return None, 'Event must be an object.'
+
+    key = event.get('idempotency_key')
+    code = event.get('unique_code')
+    direction = event.get('direction')
+    if not isinstance(key, str) or not key or len(key) > 64:
+        return None, 'idempotency_key is required (max 64 characters).'
+    if not isinstance(code, str) or not code:
+        return None, 'unique_code is required.'
+    if direction not in DIRECTIONS:
+        return None, 'direction must be in or out.'
+
+    try:
+        scanned_at = datetime.fromisoformat(str(event.get('timestamp')))
+    except ValueError:
+        return None, 'timestamp must be ISO 8601.'
+    scanned_at = tz.localize(scanned_at) if scanned_at.tzinfo is None else scanned_at.astimezone(tz)
+    if scanned_at > now + timedelta(minutes=5):
+        return None, 'timestamp is in the future.'
+
+    return {'key': key, 'code': code.strip().upper(), 'direction': direction, 'scanned_at': scanned_at}, None
+
+
+def _apply(events):
+    """Apply parsed, not-yet-seen events in scan order; returns {key: result}.
+
+    The kiosk_events rows are claimed first with INSERT ... ON CONFLICT DO
+    NOTHING RETURNING, so when the same queue is replayed concurrently only
+    one request applies each event; keys missing from the result were taken
+    by the other request and are left out (reported as duplicates).
+    """
+    if not events:
+        return {}
+    codes = member_codes.resolve({event['code'] for event in events})
+    claimed = set(db.session.execute(
+        _insert(KioskEvent).on_conflict_do_nothing(index_elements=['idempotency_key'])
+        .returning(KioskEvent.idempotency_key),
+        [
+            {
+                'idempotency_key': event['key'],
+                'member_id': codes.get(event['code']),
+                'unique_code': event['code'],
+                'direction': event['direction'],
+                'scanned_at': event['scanned_at'],
+                'result': 'pending'
+            }
+            for event in events
+        ]
+    ).scalars())
+
+    results = {}
+    for event in sorted(events, key=lambda event: event['scanned_at']):
+        if event['key'] not in claimed:
+            continue
+        member_id = codes.get(event['code'])
+        if member_id is None:
+            result = 'unknown_code'
+        elif event['direction'] == 'in':
+            result = 'ok' if time_in(member_id, event['scanned_at']) else 'already_in'
+        else:
+            result = time_out(member_id, event['scanned_at'])
+        results[event['key']] = result
+
+    if results:
+        db.session.execute(
+            db.update(KioskEvent.__table__)
+            .where(KioskEvent.idempotency_key == db.bindparam('b_key'))
+            .values(result=db.bindparam('b_result')),
+            [{'b_key': key, 'b_result': result} for key, result in results.items()]
+        )
+    return results
+
+
+def process_batch(raw_events):
+    """Validate, deduplicate and apply a batch of scans in one transaction.
+
+    Returns per-event results in request order: {"idempotency_key", "status",
+    "result"} where status is applied, duplicate or invalid.
+    """
+    now = datetime.now(pytz.timezone('Asia/Manila'))
+    parsed, errors = [], {}
+    for index, raw in enumerate(raw_events):
+        event, error = _parse_event(raw, now)
+        parsed.append(event)
+        if error:
+            errors[index] = error
+
+    # Keys already applied by an earlier request (or earlier in this batch)
+    keys = {event['key'] for event in parsed if event}
+    stored = dict(
+        db.session.query(KioskEvent.idempotency_key, KioskEvent.result)
+        .filter(KioskEvent.idempotency_key.in_(keys))
+        .all()
+    ) if keys else {}
+
+    fresh, seen = [], set()
+    for event in parsed:
+        if event and event['key'] not in stored and event['key'] not in seen:
+            seen.add(event['key'])
+            fresh.append(event)
+
+    try:
+        applied = _apply(fresh)
+        db.session.commit()
+    except IntegrityError:
+        # A cached member_id can outlive a member deleted by another worker
+        db.session.rollback()
+        member_codes.clear()
+        applied = _apply(fresh)
+        db.session.commit()
+
+    # Claimed by a concurrent replay of the same queue: report its results
+    lost = {event['key'] for event in fresh} - set(applied)
+    if lost:
+        stored.update(
+            db.session.query(KioskEvent.idempotency_key, KioskEvent.result)
+            .filter(KioskEvent.idempotency_key.in_(lost))
+            .all()
+        )
+
+    if any(result == 'ok' for result in applied.values()):
+        cache.invalidate('attendance')
+
+    results, reported = [], set()
+    for index, event in enumerate(parsed):
+        if index in errors:
+            raw = raw_events[index]
+            key = raw.get('idempotency_key') if isinstance(raw, dict) else None
+            results.append({"idempotency_key": key, "status": "invalid", "error": errors[index]})
+        elif event['key'] in applied and event['key'] not in reported:
+            reported.add(event['key'])
+            results.append({"idempotency_key": event['key'], "status": "applied", "result": applied[event['key']]})
+        else:
+            result = stored.get(event['key'], applied.get(event['key']))
+            results.append({"idempotency_key": event['key'], "status": "duplicate", "result": result})
+    return results
+
+
+# ========================================
+# KIOSK: BATCH CHECK-IN / CHECK-OUT
+# POST /kiosk/attendance/batch {"events": [{unique_code, timestamp, direction, idempotency_key}]}
+# ========================================
+def _kiosk_authorized():
+    """Admin session, or X-Kiosk-Token matching KIOSK_TOKEN when one is configured."""
+    if 'admin_id' in session:
+        return True
+    token = current_app.config.get('KIOSK_TOKEN') or os.environ.get('KIOSK_TOKEN')
+    supplied = request.headers.get('X-Kiosk-Token', '')
+    return bool(token) and hmac.compare_digest(token, supplied)
+
+
+@kiosk.route('/kiosk/attendance/batch', methods=['POST'])
+def attendance_batch():
+    if not _kiosk_authorized():
+        return jsonify({"success": False, "error": "Kiosk token or admin login required."}), 401
+
+    data = request.get_json(silent=True) or {}
+    events = data.get('events')
+    if not isinstance(events, list) or not events:
+        return jsonify({"success": False, "error": "events must be a non-empty list."}), 400
+    if len(events) > MAX_BATCH:
+        return jsonify({"success": False, "error": f"At most {MAX_BATCH} events per batch."}), 400
+
+    try:
+        results = process_batch(events)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    return jsonify({
+        "success": True,
+        "applied": sum(1 for result in results if result["status"] == "applied"),
+        "results": results
+    })
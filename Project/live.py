@@ -0,0 +1,228 @@
+from flask import Blueprint, Response, jsonify, stream_with_context
+from . import db
+from .adminAuth import require_admin
+from .cache import cache
+from .models import Member, AttendanceLog
+from datetime import datetime
+from sqlalchemy import event
+import json
+import queue
+import threading
+import pytz
+
+live = Blueprint('live', __name__)
+live.before_request(require_admin)
+
+KEEPALIVE_SECONDS = 15
+# Cache tags whose invalidation means the dashboard documents changed
+DASHBOARD_TAGS = {'members', 'payments', 'renewals', 'pricing'}
+
+
+def _today():
+    return datetime.now(pytz.timezone('Asia/Manila')).date()
+
+
+# ========================================
+# OCCUPANCY INDEX (who is in the gym now, per process)
+# ========================================
+class OccupancyIndex:
+    """member_id -> open attendance session for today; rebuilt from the
+    database at startup and when the day rolls over, then kept current by
+    committed check-ins and check-outs."""
+
+    def __init__(self):
+        self._day = None
+        self._present = {}
+        self._lock = threading.Lock()
+
+    def rebuild(self):
+        today = _today()
+        rows = (
+            db.session.query(AttendanceLog.member_id, AttendanceLog.time_in,
+                             Member.first_name, Member.last_name, Member.member_type)
+            .join(Member, AttendanceLog.member_id == Member.member_id)
+            .filter(AttendanceLog.date == today, AttendanceLog.time_in.is_not(None),
+                    AttendanceLog.time_out.is_(None))
+            .all()
+        )
+        with self._lock:
+            self._day = today
+            self._present = {
+                member_id: self._entry(member_id, time_in, f"{first_name} {last_name}", member_type)
+                for member_id, time_in, first_name, last_name, member_type in rows
+            }
+
+    @staticmethod
+    def _entry(member_id, time_in, name=None, member_type=None):
+        return {
+            "member_id": member_id,
+            "name": name,
+            "member_type": member_type,
+            "time_in": time_in.strftime("%Y-%m-%d %H:%M:%S") if time_in else None
+        }
+
+    def apply(self, name, data):
+        """Apply a committed check-in/out; returns the new count, or None when
+        the index does not hold the scan's day. That is either a replayed
+        offline scan from an earlier day (not "in the gym now") or an index
+        still on yesterday, which the next snapshot() rebuilds."""
+        moment = data['time_in'] if name == 'check_in' else data['time_out']
+        with self._lock:
+            if moment.date() != self._day:
+                return None
+            if name == 'check_in':
+                self._present[data['member_id']] = self._entry(data['member_id'], data['time_in'])
+            elif name == 'check_out':
+                self._present.pop(data['member_id'], None)
+            return len(self._present)
+
+    def snapshot(self):
+        """Current occupants (names filled in); rebuilds first after midnight."""
+        if self._day != _today():
+            self.rebuild()
+        self._fill_profiles()
+        with self._lock:
+            return {"count": len(self._present), "members": list(self._present.values())}
+
+    def profile(self, member_id):
+        self._fill_profiles()
+        with self._lock:
+            return dict(self._present.get(member_id) or self._entry(member_id, None))
+
+    def _fill_profiles(self):
+        """Load names for occupants added by check-in events (one query)."""
+        with self._lock:
+            missing = [member_id for member_id, entry in self._present.items() if entry['name'] is None]
+        if not missing:
+            return
+        profiles = {
+            member_id: (f"{first_name} {last_name}", member_type)
+            for member_id, first_name, last_name, member_type in
+            db.session.query(Member.member_id, Member.first_name, Member.last_name, Member.member_type)
+            .filter(Member.member_id.in_(missing))
+        }
+        with self._lock:
+            for member_id, (name, member_type) in profiles.items():
+                if member_id in self._present:
+                    self._present[member_id].update(name=name, member_type=member_type)
+
+
+# ========================================
+# EVENT BROKER (fan-out to SSE subscribers, per process)
+# ========================================
+class EventBroker:
+    def __init__(self, max_queue=256):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, name, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((name, data))
+            except queue.Full:
+                # A stalled client loses its backlog and gets a fresh snapshot
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait(('resync', None))
+
+
+occupancy = OccupancyIndex()
+broker = EventBroker()
+
+
+# ========================================
+# PUBLISHING (after commit only)
+# ========================================
+def queue_event(name, data):
+    """Publish `name` once the current transaction commits (dropped on rollback)."""
+    db.session.info.setdefault('live_events', []).append((name, data))
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_committed(session):
+    for name, data in session.info.pop('live_events', []):
+        if name in ('check_in', 'check_out'):
+            count = occupancy.apply(name, data)
+            if count is None:
+                # Today's scan on a stale index: have streams re-snapshot;
+                # earlier days' scans (kiosk replays) are not live events
+                if data.get('time_in', data.get('time_out')).date() == _today():
+                    broker.publish('resync', None)
+                continue
+            data = {**data, "count": count}
+        broker.publish(name, data)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _drop_rolled_back(session):
+    session.info.pop('live_events', None)
+
+
+def _publish_dashboard(tags):
+    changed = sorted(DASHBOARD_TAGS.intersection(tags))
+    if changed:
+        broker.publish('dashboard', {"tags": changed})
+
+
+cache.on_invalidate(_publish_dashboard)
+
+
+# ========================================
+# ADMIN: LIVE OCCUPANCY + SERVER-SENT EVENTS
+# Events: occupancy (snapshot), check_in, check_out, dashboard, renewal_request
+# ========================================
+def _sse(name, data):
+    # Only datetimes reach the default hook; format them like the JSON APIs do
+    payload = json.dumps(data, default=lambda value: value.strftime("%Y-%m-%d %H:%M:%S"))
+    return f"event: {name}\ndata: {payload}\n\n"
+
+
+@live.route('/admin/live/occupancy', methods=['GET'])
+def live_occupancy():
+    snapshot = occupancy.snapshot()
+    db.session.close()
+    return jsonify(snapshot)
+
+
+@live.route('/admin/live/stream', methods=['GET'])
+def live_stream():
+    subscriber = broker.subscribe()
+
+    def generate():
+        try:
+            yield _sse('occupancy', occupancy.snapshot())
+            db.session.close()  # don't hold a pooled connection while idle
+            while True:
+                try:
+                    name, data = subscriber.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if name == 'resync':
+                    name, data = 'occupancy', occupancy.snapshot()
+                elif name == 'check_in':
+                    data = {**occupancy.profile(data['member_id']), "count": data['count']}
+                yield _sse(name, data)
+                db.session.close()
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
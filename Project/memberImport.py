@@ -0,0 +1,293 @@
+from flask import Blueprint, request, jsonify
+from . import db
+from .adminAuth import require_admin
+from .cache import cache
+from .models import Member, MembershipLog, Payment, MemberCodeSequence, CODE_PREFIXES
+from .pricing import prices
+from .rollups import bump
+from .userAuth import is_valid_email, calculate_end_date
+from datetime import datetime
+from itertools import islice
+import csv
+import io
+import pytz
+
+memberImport = Blueprint('memberImport', __name__)
+memberImport.before_request(require_admin)
+
+MEMBER_TYPES = ('Student', 'Faculty', 'Outsider')
+GYM_PLANS = ('Daily', 'Monthly', 'Annual')
+STATUSES = ('Active', 'Inactive', 'Expired')
+PAYMENT_STATUSES = ('Paid', 'Unpaid', 'Overdue')
+MAX_REPORTED_ERRORS = 1000  # row errors listed in the report; later ones are only counted
+
+
+# ========================================
+# ROW SOURCES (streamed, one row at a time)
+# ========================================
+def _normalize_header(name):
+    return str(name or '').strip().lower().replace(' ', '_')
+
+
+def iter_csv_rows(stream):
+    """Yield dict rows from a binary CSV stream without reading it all into memory."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    reader.fieldnames = [_normalize_header(name) for name in reader.fieldnames or []]
+    yield from reader
+
+
+def iter_xlsx_rows(stream):
+    """Yield dict rows from an .xlsx stream using openpyxl's read-only mode."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires the openpyxl package; upload a CSV instead.")
+
+    sheet = load_workbook(stream, read_only=True, data_only=True).active
+    rows = sheet.iter_rows(values_only=True)
+    header = [_normalize_header(name) for name in next(rows, ())]
+    for values in rows:
+        yield {key: ('' if value is None else str(value)) for key, value in zip(header, values)}
+
+
+def iter_rows(stream, filename):
+    if filename.lower().endswith('.xlsx'):
+        return iter_xlsx_rows(stream)
+    return iter_csv_rows(stream)
+
+
+# ========================================
+# VALIDATION (same rules as add_member / user_register)
+# ========================================
+def _parse_date(value, field, errors):
+    try:
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    except ValueError:
+        errors.append(f"{field} must be YYYY-MM-DD.")
+
+
+def validate_member_row(row, today):
+    """Return (member values, errors) for one import row."""
+    get = lambda key: (row.get(key) or '').strip()
+    errors = []
+
+    first_name, last_name = get('first_name'), get('last_name')
+    member_type, gym_plan = get('member_type').title(), get('gym_plan').title()
+    email = get('email').lower() or None
+    student_number = get('student_number') or None
+    gender = get('gender').title() or None
+    status = get('status').title() or 'Inactive'
+    payment_status = get('payment_status').title() or 'Unpaid'
+
+    if not first_name or not last_name:
+        errors.append('First name and last name are required.')
+    if member_type not in MEMBER_TYPES:
+        errors.append('Member type is required.')
+    if member_type == 'Student' and not student_number:
+        errors.append('Student number is required for students.')
+    if gym_plan not in GYM_PLANS:
+        errors.append('Gym plan is required.')
+    if email and not is_valid_email(email):
+        errors.append('Email is not valid.')
+    if gender and gender not in ('Male', 'Female'):
+        errors.append('Gender must be Male or Female.')
+    if status not in STATUSES:
+        errors.append('Invalid status.')
+    if payment_status not in PAYMENT_STATUSES:
+        errors.append('Invalid payment status.')
+
+    age = None
+    if get('age'):
+        try:
+            age = int(float(get('age')))
+            if age < 1 or age > 120:
+                raise ValueError
+        except ValueError:
+            errors.append('Valid age is required.')
+
+    start_date = _parse_date(get('start_date'), 'start_date', errors) if get('start_date') else today
+    end_date = _parse_date(get('end_date'), 'end_date', errors) if get('end_date') else None
+    if start_date and end_date is None and gym_plan in GYM_PLANS:
+        end_date = calculate_end_date(start_date, gym_plan)
+    if start_date and end_date and end_date < start_date:
+        errors.append('end_date is before start_date.')
+
+    values = {
+        'first_name': first_name,
+        'last_name': last_name,
+        'age': age,
+        'gender': gender,
+        'member_type': member_type,
+        'student_number': student_number if member_type == 'Student' else None,
+        'gym_plan': gym_plan,
+        'email': email,
+        'contact_number': get('contact_number') or None,
+        'address': get('address') or None,
+        'start_date': start_date,
+        'end_date': end_date,
+        'status': status,
+        'payment_status': payment_status
+    }
+    return values, errors
+
+
+# ========================================
+# BATCHED IMPORT
+# ========================================
+def _insert_batch(batch, price_table):
+    """Insert validated (row_number, values) pairs: members, logs and payments in bulk.
+
+    Only Paid rows get a payment row and count towards revenue.
+    """
+    now = datetime.now(pytz.timezone('Asia/Manila'))
+
+    # Reserve unique codes per prefix with one sequence UPDATE each
+    by_prefix = {}
+    for _, values in batch:
+        by_prefix.setdefault(CODE_PREFIXES.get(values['member_type'], 'MBR'), []).append(values)
+    for prefix, group in by_prefix.items():
+        last = MemberCodeSequence.allocate(prefix, len(group))
+        for offset, values in enumerate(group):
+            values['unique_code'] = f"{prefix}-{last - len(group) + 1 + offset:04d}"
+
+    rows = []
+    for _, values in batch:
+        rows.append({
+            **values,
+            'price_paid': price_table.price(values['member_type'], values['gym_plan'], now.date()) or 0.0,
+            'date_registered': now,
+            'is_self_registered': False
+        })
+
+    member_ids = db.session.execute(
+        db.insert(Member).returning(Member.member_id, sort_by_parameter_order=True),
+        rows
+    ).scalars().all()
+
+    db.session.execute(db.insert(MembershipLog), [
+        {
+            'member_id': member_id,
+            'action_type': 'Registered',
+            'action_date': now,
+            'remarks': f"Member {row['first_name']} {row['last_name']} registered via bulk import."
+        }
+        for member_id, row in zip(member_ids, rows)
+    ])
+    payments = [
+        {
+            'member_id': member_id,
+            'member_type': row['member_type'],
+            'plan_type': row['gym_plan'],
+            'amount': row['price_paid'],
+            'payment_type': 'Registration',
+            'paid_at': now
+        }
+        for member_id, row in zip(member_ids, rows) if row['payment_status'] == 'Paid'
+    ]
+    if payments:
+        db.session.execute(db.insert(Payment), payments)
+
+    # Daily rollup: one upsert per (type, plan) in the batch
+    totals = {}
+    for row in rows:
+        key = (row['member_type'], row['gym_plan'])
+        counts = totals.setdefault(key, {'registrations': 0, 'active_delta': 0, 'revenue': 0.0})
+        counts['registrations'] += 1
+        counts['active_delta'] += 1 if row['status'] == 'Active' else 0
+        counts['revenue'] += row['price_paid'] if row['payment_status'] == 'Paid' else 0.0
+    for (member_type, plan_type), counts in totals.items():
+        bump(now.date(), member_type, plan_type, **counts)
+
+    db.session.commit()
+    return len(member_ids)
+
+
+def _report_error(report, row_number, errors):
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": row_number, "errors": errors})
+    else:
+        report["errors_truncated"] = True
+
+
+def import_members(rows, batch_size=200):
+    """Validate and insert streamed rows in chunked transactions.
+
+    Memory stays bounded by batch_size; duplicate emails are checked against
+    the database (earlier batches are already committed) and within the batch.
+    If the file becomes unreadable partway (bad encoding, malformed CSV), the
+    rows read so far are still imported and the import stops there.
+    Returns {"imported", "failed", "batches", "errors": [{"row", "errors"}]},
+    plus "read_error": {"row", "error"} when it stopped early and
+    "errors_truncated" when more than MAX_REPORTED_ERRORS rows failed.
+    """
+    today = datetime.now(pytz.timezone('Asia/Manila')).date()
+    price_table = prices.table()  # one snapshot for the whole import
+    report = {"imported": 0, "failed": 0, "batches": 0, "errors": []}
+    numbered = enumerate(rows, start=2)  # row 1 is the header
+    next_row = 2
+
+    while "read_error" not in report:
+        chunk = []
+        try:
+            for row_number, row in islice(numbered, batch_size):
+                chunk.append((row_number, row))
+                next_row = row_number + 1
+        except (ValueError, csv.Error, UnicodeDecodeError) as e:
+            report["read_error"] = {"row": next_row, "error": str(e)}
+        if not chunk:
+            break
+
+        validated = [(row_number, *validate_member_row(row, today)) for row_number, row in chunk]
+        emails = {values['email'] for _, values, errors in validated if values['email'] and not errors}
+        taken = {
+            email for (email,) in
+            db.session.query(Member.email).filter(Member.email.in_(emails))
+        } if emails else set()
+
+        batch, seen = [], set()
+        for row_number, values, errors in validated:
+            email = values['email']
+            if email and (email in taken or email in seen):
+                errors.append('Email already registered.')
+            if errors:
+                _report_error(report, row_number, errors)
+                continue
+            if email:
+                seen.add(email)
+            batch.append((row_number, values))
+
+        report["failed"] += len(chunk) - len(batch)
+        if batch:
+            try:
+                report["imported"] += _insert_batch(batch, price_table)
+                report["batches"] += 1
+            except Exception as e:
+                db.session.rollback()
+                report["failed"] += len(batch)
+                for row_number, _ in batch:
+                    _report_error(report, row_number, [str(e)])
+
+    if report["imported"]:
+        cache.invalidate('members', 'payments')
+    return report
+
+
+# ========================================
+# ADMIN: BULK IMPORT ENDPOINT
+# ========================================
+@memberImport.route('/admin/members/import', methods=['POST'])
+def import_members_upload():
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({"success": False, "error": "Please upload a CSV or XLSX file."}), 400
+
+    batch_size = min(max(request.form.get('batch_size', 200, type=int), 1), 1000)
+    report = import_members(iter_rows(upload.stream, upload.filename), batch_size)
+
+    read_error = report.get("read_error")
+    if read_error:
+        # Batches before the unreadable row are already saved: say so
+        error = f"Could not read file at row {read_error['row']}: {read_error['error']}"
+        return jsonify({"success": False, "error": error, **report}), 200 if report["imported"] else 400
+
+    return jsonify({"success": report["failed"] == 0, **report}), 200
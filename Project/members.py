@@ -0,0 +1,166 @@
+from . import db
+from .cache import cache
+from .models import MembershipLog, Payment, RenewalRequest
+from .pricing import prices
+from .rollups import bump, record_registration, record_payment, record_status_change, member_key
+from contextlib import contextmanager
+from datetime import timedelta
+from sqlalchemy.orm import joinedload
+
+PLAN_DAYS = {'Daily': 1, 'Monthly': 30, 'Annual': 365}
+
+
+# ========================================
+# UNIT OF WORK (one transaction per member write)
+# ========================================
+@contextmanager
+def unit_of_work(*tags):
+    """Run a member write, its audit log rows and rollup updates as one
+    transaction: a single commit on success, rollback (and re-raise) on
+    error. The given cache tags are invalidated after the commit.
+    """
+    try:
+        yield db.session
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if tags:
+        cache.invalidate(*tags)
+
+
+def audit(member, action_type, remarks):
+    """Queue a MembershipLog row for `member` (no flush needed for new members)."""
+    db.session.add(MembershipLog(member=member, action_type=action_type, remarks=remarks))
+
+
+# ========================================
+# MEMBER WRITES (inside a unit_of_work)
+# ========================================
+def collect_payment(member, payment_type):
+    """Ledger row and revenue for a Paid member's current price_paid."""
+    payment = Payment.for_member(member, payment_type)
+    db.session.add(payment)
+    record_payment(payment)
+    return payment
+
+
+def register_member(member, action_type, remarks):
+    """Add a new member with its rollup counts and log. Revenue counts only
+    Paid members, so an Unpaid registration gets no payment row; returns
+    the payment or None."""
+    db.session.add(member)
+    record_registration(member)
+    audit(member, action_type, remarks)
+    if member.payment_status == 'Paid':
+        return collect_payment(member, 'Registration')
+    return None
+
+
+def record_change(member, before, action_type, remarks):
+    """After editing `member`: move its rollup counts from `before`
+    (member_key taken before the edit) and log the change."""
+    record_status_change(before, member_key(member))
+    audit(member, action_type, remarks)
+
+
+def remove_member(member):
+    """Delete a member. Its logs, workouts, attendance and renewal requests go
+    with it, so no audit row is written (it would be cascaded away too)."""
+    record_status_change(member_key(member), (None, None, None))
+    db.session.delete(member)
+
+
+# ========================================
+# RENEWALS
+# ========================================
+def renew(member, plan, now, price):
+    """Start a paid `plan` period for `member` today (in memory only)."""
+    today = now.date()
+    member.gym_plan = plan
+    member.status = "Active"
+    member.payment_status = "Paid"
+    member.start_date = today
+    member.end_date = today + timedelta(days=PLAN_DAYS.get(plan, 30))
+    member.last_payment_date = now
+    member.price_paid = price
+
+
+def decide_renewals(request_ids, status, now):
+    """Approve or deny many renewal requests (inside a unit_of_work).
+
+    Only Pending requests are claimed, with one conditional UPDATE, so a
+    request decided concurrently is never applied twice. Requests and their
+    members are then loaded with one query, prices come from one table
+    snapshot, and logs, payments and rollup counts are written in bulk.
+    Returns {request_id: 'approved' | 'denied' | 'already_processed' | 'not_found'}.
+    """
+    claimed = set(db.session.execute(
+        db.update(RenewalRequest)
+        .where(RenewalRequest.id.in_(request_ids), RenewalRequest.status == 'Pending')
+        .values(status=status)
+        .returning(RenewalRequest.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+    found = {
+        renewal_request.id: renewal_request
+        for renewal_request in db.session.execute(
+            db.select(RenewalRequest)
+            .options(joinedload(RenewalRequest.member))
+            .where(RenewalRequest.id.in_(request_ids))
+        ).scalars()
+    }
+
+    table = prices.table()
+    price_for = {}
+    logs, payments, totals = [], [], {}
+    outcomes = {}
+    for request_id in request_ids:
+        renewal_request = found.get(request_id)
+        if renewal_request is None:
+            outcomes[request_id] = 'not_found'
+            continue
+        if request_id not in claimed:
+            outcomes[request_id] = 'already_processed'
+            continue
+        renewal_request.status = status  # the UPDATE above did not touch loaded objects
+        member = renewal_request.member
+
+        if status == 'Denied':
+            outcomes[request_id] = 'denied'
+            logs.append({
+                'member_id': member.member_id, 'action_type': 'Renewal Denied', 'action_date': now,
+                'remarks': f"Renewal request for {renewal_request.requested_plan} plan denied."
+            })
+            continue
+
+        key = (member.member_type, renewal_request.requested_plan)
+        if key not in price_for:
+            price_for[key] = table.price(*key, now.date()) or 0.0
+
+        before = member_key(member)
+        renew(member, renewal_request.requested_plan, now, price_for[key])
+
+        # Daily rollup: summed per (type, plan), one upsert each below
+        for (state, member_type, plan_type), delta in ((before, -1), (member_key(member), 1)):
+            if state == 'Active':
+                totals.setdefault((member_type, plan_type), {'active_delta': 0, 'revenue': 0.0})['active_delta'] += delta
+        totals.setdefault(key, {'active_delta': 0, 'revenue': 0.0})['revenue'] += member.price_paid
+
+        outcomes[request_id] = 'approved'
+        logs.append({
+            'member_id': member.member_id, 'action_type': 'Renewal Approved', 'action_date': now,
+            'remarks': f"Renewal approved. Plan updated to {member.gym_plan}, payment status {member.payment_status}."
+        })
+        payments.append({
+            'member_id': member.member_id, 'member_type': member.member_type, 'plan_type': member.gym_plan,
+            'amount': member.price_paid, 'payment_type': 'Renewal', 'paid_at': now
+        })
+
+    if logs:
+        db.session.execute(db.insert(MembershipLog), logs)
+    if payments:
+        db.session.execute(db.insert(Payment), payments)
+    for (member_type, plan_type), counts in totals.items():
+        bump(now.date(), member_type, plan_type, **counts)
+    return outcomes
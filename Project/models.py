@@ -2,6 +2,7 @@ import pytz
 from . import db
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.ext.hybrid import hybrid_property
 
 
 # ========================================
@@ -51,6 +52,63 @@ class PriceHistory(db.Model):
     def __repr__(self):
         return f"<PriceChange {self.member_type} - {self.plan_type}: ₱{self.old_price} → ₱{self.new_price}> "
 
+# ========================================
+# MEMBER CODE SEQUENCE MODEL
+# ========================================
+CODE_PREFIXES = {
+    'Student': 'STU',
+    'Faculty': 'FCT',
+    'Outsider': 'OTD'
+}
+
+class MemberCodeSequence(db.Model):
+    """Last number handed out per unique_code prefix (STU, FCT, OTD, MBR)."""
+    __tablename__ = 'member_code_sequences'
+
+    prefix = db.Column(db.String(10), primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def allocate(prefix, count=1):
+        """Reserve `count` numbers inside the caller's transaction and return the last one.
+
+        The UPDATE takes the row's write lock, so concurrent registrations
+        serialize here instead of colliding on the unique constraint.
+        """
+        value = db.session.execute(
+            db.update(MemberCodeSequence)
+            .where(MemberCodeSequence.prefix == prefix)
+            .values(last_value=MemberCodeSequence.last_value + count)
+            .returning(MemberCodeSequence.last_value)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+
+        if value is None:
+            # First code for this prefix: seed from existing codes once
+            value = MemberCodeSequence.highest_existing(prefix) + count
+            db.session.add(MemberCodeSequence(prefix=prefix, last_value=value))
+            db.session.flush()
+        return value
+
+    @staticmethod
+    def highest_existing(prefix):
+        """Highest number already used in members.unique_code for this prefix."""
+        number = db.cast(db.func.substr(Member.unique_code, len(prefix) + 2), db.Integer)
+        return db.session.query(db.func.max(number)).filter(
+            Member.unique_code.like(f"{prefix}-%")
+        ).scalar() or 0
+
+    @staticmethod
+    def seed_all():
+        """One-time migration: create missing sequence rows from existing codes."""
+        for prefix in [*CODE_PREFIXES.values(), 'MBR']:
+            if db.session.get(MemberCodeSequence, prefix) is None:
+                db.session.add(MemberCodeSequence(prefix=prefix, last_value=MemberCodeSequence.highest_existing(prefix)))
+        db.session.commit()
+
+    def __repr__(self):
+        return f"<MemberCodeSequence {self.prefix}: {self.last_value}>"
+
 # ========================================
 # MEMBER MODEL
 # ========================================
@@ -83,6 +141,8 @@ class Member(db.Model):
 
     logs = db.relationship('MembershipLog', backref='member', lazy=True, cascade='all, delete-orphan')
     workouts = db.relationship('Workout', backref='member', lazy=True, cascade='all, delete-orphan')
+    # No delete cascade: payments outlive the member (member_id is set to NULL)
+    payments = db.relationship('Payment', backref='member', lazy=True)
 
     # Track original type
     _original_member_type = None
@@ -95,30 +155,9 @@ class Member(db.Model):
         self._original_member_type = self.member_type  # track original type
 
     def generate_unique_code(self, member_type):
-        """Generate a truly unique code like STU-0001, avoiding duplicates even if records were deleted."""
-        prefix_map = {
-            'Student': 'STU',
-            'Faculty': 'FCT',
-            'Outsider': 'OTD'
-        }
-        prefix = prefix_map.get(member_type, 'MBR')
-
-        # Query all codes starting with the prefix
-        existing_codes = Member.query.with_entities(Member.unique_code).filter(
-            Member.unique_code.like(f"{prefix}-%")
-        ).all()
-
-        max_num = 0
-        for code_tuple in existing_codes:
-            code = code_tuple[0]
-            try:
-                num = int(code.split('-')[1])
-                max_num = max(max_num, num)
-            except (ValueError, IndexError):
-                pass
-
-        # Always return one higher than the highest found
-        return f"{prefix}-{max_num + 1:04d}"
+        """Generate a truly unique code like STU-0001 from the per-prefix sequence (never reused)."""
+        prefix = CODE_PREFIXES.get(member_type, 'MBR')
+        return f"{prefix}-{MemberCodeSequence.allocate(prefix):04d}"
 
     def update_member_type(self, new_type):
         """Smart update: regenerate unique_code if type changes."""
@@ -127,14 +166,9 @@ class Member(db.Model):
             self.unique_code = self.generate_unique_code(new_type)
 
     def get_current_price(self):
-        """Fetch the most recent price for this member's type and plan."""
-        latest_price = (
-            GymPricing.query
-            .filter_by(member_type=self.member_type, plan_type=self.gym_plan)
-            .order_by(GymPricing.effective_date.desc())
-            .first()
-        )
-        return latest_price.price if latest_price else 0.0
+        """Price in force today for this member's type and plan (no query)."""
+        from .pricing import prices
+        return prices.price(self.member_type, self.gym_plan)
 
     def set_registration_price(self):
         """Set price_paid when the member registers."""
@@ -153,20 +187,113 @@ class Member(db.Model):
             return False
         return check_password_hash(self.password_hash, password)
 
+    @staticmethod
+    def by_email(email):
+        """Login / registration lookup by email."""
+        return Member.query.filter_by(email=email)
+
+    @staticmethod
+    def count_by(*columns):
+        """Member counts grouped by `columns` (dashboard status breakdowns)."""
+        return db.session.query(*columns, db.func.count(Member.member_id)).group_by(*columns)
+
     # ========================================
     # AUTO STATUS CHECKER
     # ========================================
-    def check_and_update_status(self):
-        """Automatically update member status based on current date."""
+    @hybrid_property
+    def effective_status(self):
+        """Status as of today (Asia/Manila), derived from end_date without writing.
+
+        The expiry sweep persists it for members whose end_date has passed.
+        """
         current_date = datetime.now(pytz.timezone('Asia/Manila')).date()
 
         if current_date > self.end_date:
-            self.status = 'Expired'
-        elif self.status == 'Expired' and current_date <= self.end_date:
-            # Optional: revive the member if extended manually
-            self.status = 'Active'
+            return 'Expired'
+        if self.status == 'Expired':
+            # Revived: the end date was extended manually
+            return 'Active'
+        return self.status
+
+    @effective_status.expression
+    def effective_status(cls):
+        current_date = datetime.now(pytz.timezone('Asia/Manila')).date()
+        return db.case(
+            (cls.end_date < current_date, 'Expired'),
+            (cls.status == 'Expired', 'Active'),
+            else_=cls.status
+        )
+
+# Covering indexes for the monthly registration and status breakdowns
+db.Index('ix_members_registered_type', Member.date_registered, Member.member_type)
+db.Index('ix_members_status_payment', Member.status, Member.payment_status)
+
+# Keyset pagination / filters for /admin/members-json; SQLite appends the
+# rowid (member_id) to every index, so each one is already in (key, id) order
+db.Index('ix_members_last_name', Member.last_name)
+db.Index('ix_members_start_date', Member.start_date)
+db.Index('ix_members_end_date', Member.end_date)
+db.Index('ix_members_member_type', Member.member_type)
+db.Index('ix_members_gym_plan', Member.gym_plan)
+
+# Login / registration duplicate check
+db.Index('ix_members_email', Member.email)
+
+# Expiry sweep: only members the sweep may still flip are indexed, walked in
+# member_id order with end_date alongside (same predicate as the sweep query)
+db.Index(
+    'ix_members_expiry_candidates', Member.member_id, Member.end_date,
+    sqlite_where=Member.status != 'Expired',
+    postgresql_where=Member.status != 'Expired'
+)
 
+# ========================================
+# PAYMENT MODEL (append-only ledger)
+# ========================================
+class Payment(db.Model):
+    __tablename__ = 'payments'
+
+    payment_id = db.Column(db.Integer, primary_key=True)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.member_id', ondelete='SET NULL'), nullable=True, index=True)
+    member_type = db.Column(db.Enum('Faculty', 'Outsider', 'Student'), nullable=False)
+    plan_type = db.Column(db.Enum('Daily', 'Monthly', 'Annual'), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    payment_type = db.Column(db.String(50), nullable=False)  # Registration, Renewal, Payment (marked Paid later)
+    paid_at = db.Column(db.DateTime, nullable=False, index=True, default=lambda: datetime.now(pytz.timezone('Asia/Manila')))
+
+    @classmethod
+    def for_member(cls, member, payment_type, paid_at=None):
+        """Build a ledger row from the member's current type, plan and price_paid."""
+        return cls(
+            member=member,
+            member_type=member.member_type,
+            plan_type=member.gym_plan,
+            amount=member.price_paid or 0.0,
+            payment_type=payment_type,
+            paid_at=paid_at or datetime.now(pytz.timezone('Asia/Manila'))
+        )
+
+    @staticmethod
+    def backfill_from_members():
+        """Seed the ledger from paid members' last known payment (one INSERT ... SELECT)."""
+        columns = ['member_id', 'member_type', 'plan_type', 'amount', 'payment_type', 'paid_at']
+        source = (
+            db.select(
+                Member.member_id,
+                Member.member_type,
+                Member.gym_plan,
+                Member.price_paid,
+                db.case((Member.last_payment_date.is_(None), 'Registration'), else_='Renewal'),
+                db.func.coalesce(Member.last_payment_date, Member.date_registered)
+            )
+            .where(Member.payment_status == 'Paid', Member.price_paid.is_not(None))
+        )
+        result = db.session.execute(db.insert(Payment).from_select(columns, source))
         db.session.commit()
+        return result.rowcount
+
+    def __repr__(self):
+        return f"<Payment ₱{self.amount} {self.payment_type} for Member {self.member_id}>"
 
 # ========================================
 # MEMBERSHIP LOG MODEL
@@ -183,6 +310,12 @@ class MembershipLog(db.Model):
     def __repr__(self):
         return f"<Log {self.action_type} for Member {self.member_id}>"
 
+# Recent-activity feed (action_date range) and per-member history
+db.Index('ix_membership_logs_action_date', MembershipLog.action_date)
+db.Index('ix_membership_logs_member_date', MembershipLog.member_id, MembershipLog.action_date)
+# Log pages filtered by action_type, newest first
+db.Index('ix_membership_logs_type_date', MembershipLog.action_type, MembershipLog.action_date)
+
 # ========================================
 # WORKOUT MODEL
 # ========================================
@@ -198,9 +331,17 @@ class Workout(db.Model):
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(pytz.timezone('Asia/Manila')))
 
+    @staticmethod
+    def recent_for(member_id, limit=5):
+        """A member's latest workouts, newest first (user dashboard)."""
+        return Workout.query.filter_by(member_id=member_id).order_by(Workout.workout_date.desc()).limit(limit)
+
     def __repr__(self):
         return f"<Workout {self.exercise_type} - {self.duration_minutes} min by Member {self.member_id}>"
 
+# Dashboard counts, recent workouts and streaks are all per member, newest first
+db.Index('ix_workouts_member_date', Workout.member_id, Workout.workout_date)
+
 
 # ========================================
 # RENEWAL REQUEST MODEL
@@ -214,7 +355,15 @@ class RenewalRequest(db.Model):
     status = db.Column(db.Enum('Pending', 'Approved', 'Denied'), default='Pending')
     request_date = db.Column(db.DateTime, default=lambda: datetime.now(pytz.timezone('Asia/Manila')))
 
-    member = db.relationship('Member', backref='renewal_requests')
+    # passive_deletes: the database cascade removes requests with their member
+    member = db.relationship('Member', backref=db.backref('renewal_requests', passive_deletes=True))
+
+    @staticmethod
+    def pending_for(member_id):
+        return RenewalRequest.query.filter_by(member_id=member_id, status='Pending')
+
+# Pending-request check on every renewal submission
+db.Index('ix_renewal_requests_member_status', RenewalRequest.member_id, RenewalRequest.status)
 
 
 # ========================================
@@ -229,7 +378,153 @@ class AttendanceLog(db.Model):
     time_in = db.Column(db.DateTime, nullable=True)
     time_out = db.Column(db.DateTime, nullable=True)
 
-    member = db.relationship('Member', backref='attendance_logs')
+    member = db.relationship('Member', backref=db.backref('attendance_logs', passive_deletes=True))
+
+    @staticmethod
+    def merge_duplicates():
+        """Fold duplicate (member_id, date) rows into the oldest one, keeping the
+        earliest time_in and latest time_out. Returns the number of rows removed."""
+        table = AttendanceLog.__table__
+        other = table.alias('other')
+        keepers = (
+            db.select(db.func.min(table.c.attendance_id))
+            .group_by(table.c.member_id, table.c.date)
+        )
+        duplicated = keepers.having(db.func.count() > 1)
+        if db.session.execute(duplicated.limit(1)).first() is None:
+            return 0
+
+        same_day = db.and_(other.c.member_id == table.c.member_id, other.c.date == table.c.date)
+        db.session.execute(
+            db.update(table)
+            .where(table.c.attendance_id.in_(duplicated))
+            .values(
+                time_in=db.select(db.func.min(other.c.time_in)).where(same_day).scalar_subquery(),
+                time_out=db.select(db.func.max(other.c.time_out)).where(same_day).scalar_subquery()
+            )
+        )
+        removed = db.session.execute(
+            db.delete(table).where(table.c.attendance_id.not_in(keepers))
+        ).rowcount
+        db.session.commit()
+        return removed
 
     def __repr__(self):
         return f"<Attendance Member {self.member_id}: {self.date} IN:{self.time_in} OUT:{self.time_out}>"
+
+# One row per member per day; also the check-in / check-out lookup and the
+# ON CONFLICT target of the time-in upsert
+db.Index('uq_attendance_logs_member_date', AttendanceLog.member_id, AttendanceLog.date, unique=True)
+# Date-range scans of the attendance analytics (covering: no table lookups)
+db.Index('ix_attendance_logs_date_times', AttendanceLog.date, AttendanceLog.time_in, AttendanceLog.time_out)
+
+
+# ========================================
+# DAILY STATS ROLLUP MODEL
+# ========================================
+class DailyStats(db.Model):
+    """Per-day counters maintained by every member, payment and attendance write.
+
+    active_delta is the net change in Active members recorded that day; its
+    running SUM is the current number of Active members (after a rebuild the
+    per-day split is approximate, see rebuild_daily_stats).
+    """
+    __tablename__ = 'daily_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    member_type = db.Column(db.String(20), primary_key=True)
+    plan_type = db.Column(db.String(20), primary_key=True)
+    registrations = db.Column(db.Integer, nullable=False, default=0)
+    active_delta = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    check_ins = db.Column(db.Integer, nullable=False, default=0)
+    renewal_requests = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyStats {self.day} {self.member_type}/{self.plan_type}>"
+
+
+# ========================================
+# MEMBER STATS MODEL (user dashboard counters)
+# ========================================
+class MemberStats(db.Model):
+    """Per-member counters kept in step with workout and attendance writes."""
+    __tablename__ = 'member_stats'
+
+    member_id = db.Column(db.Integer, db.ForeignKey('members.member_id', ondelete='CASCADE'), primary_key=True)
+    total_workouts = db.Column(db.Integer, nullable=False, default=0)
+    total_minutes = db.Column(db.Integer, nullable=False, default=0)
+    attendance_days = db.Column(db.Integer, nullable=False, default=0)
+    last_workout_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<MemberStats Member {self.member_id}: {self.total_workouts} workouts>"
+
+
+# ========================================
+# ACTIVITY CALENDAR MODEL (day bitmaps)
+# ========================================
+class ActivityCalendar(db.Model):
+    """One year of workout or attendance days for a member as twelve month bitmaps.
+
+    Bit d-1 of m<month> is set when the member was active on that day, so a
+    whole year is twelve small integers and a day is marked with one atomic
+    `m<month> = m<month> | bit` upsert.
+    """
+    __tablename__ = 'activity_calendars'
+
+    member_id = db.Column(db.Integer, db.ForeignKey('members.member_id', ondelete='CASCADE'), primary_key=True)
+    kind = db.Column(db.String(20), primary_key=True)  # workout, attendance
+    year = db.Column(db.Integer, primary_key=True)
+    m1 = db.Column(db.Integer, nullable=False, default=0)
+    m2 = db.Column(db.Integer, nullable=False, default=0)
+    m3 = db.Column(db.Integer, nullable=False, default=0)
+    m4 = db.Column(db.Integer, nullable=False, default=0)
+    m5 = db.Column(db.Integer, nullable=False, default=0)
+    m6 = db.Column(db.Integer, nullable=False, default=0)
+    m7 = db.Column(db.Integer, nullable=False, default=0)
+    m8 = db.Column(db.Integer, nullable=False, default=0)
+    m9 = db.Column(db.Integer, nullable=False, default=0)
+    m10 = db.Column(db.Integer, nullable=False, default=0)
+    m11 = db.Column(db.Integer, nullable=False, default=0)
+    m12 = db.Column(db.Integer, nullable=False, default=0)
+
+    def months(self):
+        return [getattr(self, f"m{month}") or 0 for month in range(1, 13)]
+
+    def __repr__(self):
+        return f"<ActivityCalendar Member {self.member_id} {self.kind} {self.year}>"
+
+
+# ========================================
+# KIOSK EVENT MODEL (idempotent scan replay)
+# ========================================
+class KioskEvent(db.Model):
+    """Every applied kiosk scan, keyed by the client's idempotency key so a
+    replayed offline queue returns the stored result instead of re-applying."""
+    __tablename__ = 'kiosk_events'
+
+    idempotency_key = db.Column(db.String(64), primary_key=True)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.member_id', ondelete='SET NULL'), nullable=True)
+    unique_code = db.Column(db.String(10), nullable=False)
+    direction = db.Column(db.Enum('in', 'out'), nullable=False)
+    scanned_at = db.Column(db.DateTime, nullable=False)
+    result = db.Column(db.String(20), nullable=False)  # ok, already_in, not_in, already_out, unknown_code ('pending' until applied)
+    processed_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(pytz.timezone('Asia/Manila')))
+
+    def __repr__(self):
+        return f"<KioskEvent {self.idempotency_key} {self.direction} {self.result}>"
+
+
+# ========================================
+# JOB RUN MODEL (background/cron bookkeeping)
+# ========================================
+class JobRun(db.Model):
+    __tablename__ = 'job_runs'
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_run_at = db.Column(db.DateTime, nullable=False)
+    last_result = db.Column(db.String(255))
+
+    def __repr__(self):
+        return f"<JobRun {self.name} at {self.last_run_at}>"
@@ -0,0 +1,241 @@
+from flask import Blueprint, request, jsonify
+from . import db
+from .adminAuth import require_admin
+from .cache import cache
+from .models import GymPricing, PriceHistory, Payment
+from bisect import bisect_right
+from datetime import datetime, date
+from types import MappingProxyType
+import os
+import threading
+import time
+import pytz
+
+pricing = Blueprint('pricing', __name__)
+pricing.before_request(require_admin)
+
+MEMBER_TYPES = ('Student', 'Faculty', 'Outsider')
+PLAN_TYPES = ('Daily', 'Monthly', 'Annual')
+
+
+def _today():
+    return datetime.now(pytz.timezone('Asia/Manila')).date()
+
+
+# ========================================
+# PRICE TABLE (immutable snapshot)
+# ========================================
+class PriceTable:
+    """(member_type, plan_type) -> ascending effective dates and the price in
+    force from each date until the next.
+
+    Never mutated after construction; a refresh builds a new table and swaps
+    the reference, so a reader always sees one consistent set of prices.
+    Days before the first recorded date use the first price (the seeded
+    prices were in force before they were recorded).
+    """
+
+    __slots__ = ('_intervals', 'loaded_at')
+
+    def __init__(self, rows, loaded_at=0.0):
+        intervals = {}
+        for member_type, plan_type, effective_date, price in rows:  # by effective_date, id
+            dates, amounts = intervals.setdefault((member_type, plan_type), ([], []))
+            effective_date = effective_date or date.min
+            if dates and dates[-1] == effective_date:
+                amounts[-1] = price  # several rows for one day: the latest wins
+            else:
+                dates.append(effective_date)
+                amounts.append(price)
+
+        self._intervals = MappingProxyType({
+            key: (tuple(dates), tuple(amounts)) for key, (dates, amounts) in intervals.items()
+        })
+        self.loaded_at = loaded_at
+
+    def price(self, member_type, plan_type, day):
+        """Price in force on `day`, or None if the pair was never priced."""
+        found = self._intervals.get((member_type, plan_type))
+        if found is None:
+            return None
+        dates, amounts = found
+        return amounts[max(bisect_right(dates, day) - 1, 0)]
+
+    def intervals(self):
+        """[{member_type, plan_type, effective_from, effective_to, price}] for display."""
+        result = []
+        for (member_type, plan_type), (dates, amounts) in sorted(self._intervals.items()):
+            for index, (start, amount) in enumerate(zip(dates, amounts)):
+                end = dates[index + 1] if index + 1 < len(dates) else None
+                result.append({
+                    "member_type": member_type,
+                    "plan_type": plan_type,
+                    "effective_from": None if start == date.min else start.isoformat(),
+                    "effective_to": end.isoformat() if end else None,
+                    "price": amount
+                })
+        return result
+
+
+# ========================================
+# PRICING SERVICE (per process)
+# ========================================
+class PricingService:
+    """Zero-query price lookups from an in-memory PriceTable.
+
+    Price changes made through change_price() refresh the table at once;
+    other worker processes pick them up within PRICING_REFRESH_SECONDS.
+    """
+
+    def __init__(self, app=None):
+        self.refresh_seconds = 300
+        self._table = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PRICING_REFRESH_SECONDS', int(os.environ.get('PRICING_REFRESH_SECONDS', 300)))
+        self.refresh_seconds = app.config['PRICING_REFRESH_SECONDS']
+
+    def load(self):
+        rows = db.session.execute(
+            db.select(GymPricing.member_type, GymPricing.plan_type, GymPricing.effective_date, GymPricing.price)
+            .order_by(GymPricing.effective_date, GymPricing.id)
+        ).all()
+        table = PriceTable(rows, time.monotonic())
+        self._table = table
+        return table
+
+    def table(self):
+        table = self._table
+        if table is None or time.monotonic() - table.loaded_at > self.refresh_seconds:
+            with self._lock:
+                table = self._table
+                if table is None or time.monotonic() - table.loaded_at > self.refresh_seconds:
+                    table = self.load()
+        return table
+
+    def price(self, member_type, plan_type, day=None):
+        """Price in force on `day` (default today); 0.0 if the pair has none."""
+        price = self.table().price(member_type, plan_type, day or _today())
+        return price if price is not None else 0.0
+
+    def change_price(self, member_type, plan_type, new_price, effective_date=None):
+        """Set the price from `effective_date` (default today) and append to
+        PriceHistory; commits, refreshes the table and returns the old price."""
+        effective_date = effective_date or _today()
+        old_price = self.load().price(member_type, plan_type, effective_date)
+
+        # Rows are never updated: a second change for the same day is a newer
+        # row, which wins in the table
+        db.session.add(GymPricing(member_type=member_type, plan_type=plan_type,
+                                  price=new_price, effective_date=effective_date))
+        db.session.add(PriceHistory(member_type=member_type, plan_type=plan_type,
+                                    old_price=old_price, new_price=new_price))
+        db.session.commit()
+
+        self.load()
+        cache.invalidate('pricing')
+        return old_price
+
+
+prices = PricingService()
+
+
+# ========================================
+# REPRICING (payments vs. the price in force on the day they were made)
+# ========================================
+def reprice_payments(batch_size=1000, listed=20):
+    """Compare every payment with the table price on its paid_at day (read-only).
+
+    The payment ledger is append-only, so nothing is rewritten. Prices are
+    effective per day, so a payment taken before a same-day price change is
+    reported against that day's final price and needs a manual look.
+    Returns {"checked", "mismatched", "difference", "payments"}, where
+    "payments" lists the first `listed` mismatches.
+    """
+    table = prices.load()
+    report = {"checked": 0, "mismatched": 0, "difference": 0.0, "payments": []}
+
+    rows = db.session.execute(
+        db.select(Payment.payment_id, Payment.member_type, Payment.plan_type, Payment.amount, Payment.paid_at)
+        .execution_options(yield_per=batch_size)
+    )
+    for payment_id, member_type, plan_type, amount, paid_at in rows:
+        report["checked"] += 1
+        expected = table.price(member_type, plan_type, paid_at.date())
+        if expected is None or expected == amount:
+            continue
+        report["mismatched"] += 1
+        report["difference"] += expected - amount
+        if len(report["payments"]) < listed:
+            report["payments"].append({
+                "payment_id": payment_id, "paid_at": paid_at, "amount": amount, "expected": expected
+            })
+    return report
+
+
+# ========================================
+# ADMIN: PRICES AND PRICE CHANGES
+# GET  /admin/pricing
+# POST /admin/pricing {"member_type", "plan_type", "price", "effective_date"?}
+# ========================================
+@pricing.route('/admin/pricing', methods=['GET'])
+@cache.cached(tags=('pricing',))
+def get_pricing():
+    history = PriceHistory.query.order_by(PriceHistory.change_at.desc(), PriceHistory.id.desc()).limit(50)
+    return jsonify({
+        "prices": prices.load().intervals(),
+        "history": [
+            {
+                "member_type": change.member_type,
+                "plan_type": change.plan_type,
+                "old_price": change.old_price,
+                "new_price": change.new_price,
+                "change_at": change.change_at.strftime("%Y-%m-%d %H:%M:%S") if change.change_at else None
+            }
+            for change in history
+        ]
+    })
+
+
+@pricing.route('/admin/pricing', methods=['POST'])
+def change_pricing():
+    data = request.get_json(silent=True) or {}
+    member_type = data.get('member_type')
+    plan_type = data.get('plan_type')
+
+    if member_type not in MEMBER_TYPES:
+        return jsonify({"success": False, "error": f"member_type must be one of: {', '.join(MEMBER_TYPES)}."}), 400
+    if plan_type not in PLAN_TYPES:
+        return jsonify({"success": False, "error": f"plan_type must be one of: {', '.join(PLAN_TYPES)}."}), 400
+    try:
+        new_price = float(data.get('price'))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "price must be a number."}), 400
+    if new_price < 0:
+        return jsonify({"success": False, "error": "price cannot be negative."}), 400
+
+    effective_date = None
+    if data.get('effective_date'):
+        try:
+            effective_date = datetime.strptime(data['effective_date'], '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({"success": False, "error": "effective_date must be YYYY-MM-DD."}), 400
+        if effective_date < _today():
+            return jsonify({"success": False, "error": "effective_date cannot be in the past."}), 400
+
+    try:
+        old_price = prices.change_price(member_type, plan_type, new_price, effective_date)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    return jsonify({
+        "success": True,
+        "message": f"{member_type} {plan_type} price set to ₱{new_price:.2f}.",
+        "old_price": old_price,
+        "new_price": new_price,
+        "effective_date": (effective_date or _today()).isoformat()
+    })
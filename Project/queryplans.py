@@ -0,0 +1,108 @@
+from .models import Member, Workout, RenewalRequest
+from .addMember import lapsed_members_query, members_page_query, encode_cursor
+from .analytics import minutes_statement
+from .attendance import time_in_upsert, time_out_update
+from .rollups import revenue_by_day_query, active_by_month_query, month_buckets, _month_end
+from .statistics import _log_filters, log_page_query, log_counts_query
+from . import db
+from datetime import date, datetime, timedelta
+
+# Tables that stay a handful of rows; a full scan of these is fine
+SMALL_TABLES = {'admins', 'gym_pricing', 'price_history', 'member_code_sequences', 'job_runs'}
+
+
+# ========================================
+# HOT QUERIES (built by the same functions the routes call)
+# ========================================
+def hot_queries():
+    """[(name, statement)] for every lookup that must stay on an index."""
+    today = date.today()
+    now = datetime.now()
+    member_id = 1
+
+    ranges = [(date(year, month, 1), _month_end(year, month)) for year, month in month_buckets(today, 6)]
+    last_week, _, _ = _log_filters({}, today)
+    by_type, _, _ = _log_filters({'action_type': 'Registered,Renewal Approved'}, today)
+    by_member, _, _ = _log_filters({'member_id': str(member_id)}, today)
+
+    return [
+        ('login / registration email lookup', Member.by_email('member@example.com').limit(1)),
+        ('expiry sweep batch', lapsed_members_query(today, 0, 500)),
+        ('membership log page', log_page_query(last_week, 50)),
+        ('membership log next page', log_page_query(last_week, 50, after=(now, 10 ** 9))),
+        ('membership log page by action type', log_page_query(by_type, 50)),
+        ('membership log page by member', log_page_query(by_member, 50)),
+        ('membership log daily counts', log_counts_query(last_week)),
+        ('check-in upsert', time_in_upsert(member_id, now)),
+        ('check-out update', time_out_update(member_id, now)),
+        ('recent workouts per member', Workout.recent_for(member_id)),
+        ('pending renewal for member', RenewalRequest.pending_for(member_id).limit(1)),
+        ('weekly revenue (daily rollup)', revenue_by_day_query(today - timedelta(days=6))),
+        ('attendance analytics range', minutes_statement(today - timedelta(days=29), today)),
+        ('6-month Active chart', active_by_month_query(ranges)),
+        ('members next page', members_page_query({'cursor': encode_cursor([50, 50])}, 'member_id', 'asc', 25)),
+        ('members page by status, by last name',
+         members_page_query({'status': 'Active'}, 'last_name', 'asc', 25)),
+        ('members page by type and plan, newest end date first',
+         members_page_query({'member_type': 'Student', 'gym_plan': 'Monthly'}, 'end_date', 'desc', 25)),
+        ('members page by code prefix', members_page_query({'code': 'STU'}, 'unique_code', 'asc', 25)),
+        ('members page by registration date',
+         members_page_query({'date_from': today.isoformat(), 'date_to': today.isoformat()},
+                            'date_registered', 'desc', 25)),
+    ]
+
+
+def expected_scans():
+    """[(name, statement, allowed, reason)] for queries that may scan: their
+    plan may contain the one full-scan line `allowed`, any other fails."""
+    counts = "counts every member from the index alone, which holds both columns"
+    return [
+        ('members first page', members_page_query({}, 'member_id', 'asc', 25), 'SCAN members',
+         "walks members in member_id (rowid) order and stops at the LIMIT"),
+        ('member counts by status (dashboard, members statistics)', Member.count_by(Member.status),
+         'SCAN members USING COVERING INDEX ix_members_status_payment', counts),
+        ('member counts by status and payment (statistics summary)',
+         Member.count_by(Member.status, Member.payment_status),
+         'SCAN members USING COVERING INDEX ix_members_status_payment', counts),
+    ]
+
+
+# ========================================
+# EXPLAIN QUERY PLAN (SQLite)
+# ========================================
+def explain(conn, statement):
+    """Return the EXPLAIN QUERY PLAN detail lines for a Core statement or ORM Query."""
+    statement = getattr(statement, 'statement', statement)
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    values = tuple(params[name] for name in compiled.positiontup) if compiled.positional else params
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", values)
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan):
+    """Plan lines that read all of a large table. Only SEARCH is an index
+    lookup: SCAN ... USING [COVERING] INDEX still walks the whole index."""
+    scans = []
+    for line in plan:
+        if not line.startswith('SCAN '):
+            continue
+        table = line.split()[1]
+        if table.startswith('(') or table == 'CONSTANT' or table in SMALL_TABLES:
+            continue  # subquery results, no table at all, or a tiny lookup table
+        scans.append(line)
+    return scans
+
+
+def check_query_plans():
+    """[(name, plan, scans)] for every hot query; empty scans means it is indexed."""
+    report = []
+    with db.engine.connect() as conn:
+        for name, statement in hot_queries():
+            plan = explain(conn, statement)
+            report.append((name, plan, full_scans(plan)))
+        for name, statement, allowed, reason in expected_scans():
+            plan = explain(conn, statement)
+            scans = [line for line in full_scans(plan) if line != allowed]
+            report.append((f"{name} (expected scan: {reason})", plan, scans))
+    return report
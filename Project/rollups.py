@@ -0,0 +1,354 @@
+from . import db
+from .models import DailyStats, MemberStats, Member, Payment, AttendanceLog, RenewalRequest, Workout
+from datetime import datetime, date, timedelta
+from sqlalchemy import event, func
+from sqlalchemy.dialects import postgresql, sqlite
+import pytz
+
+COUNTERS = ('registrations', 'active_delta', 'revenue', 'check_ins', 'renewal_requests')
+
+
+def _today():
+    return datetime.now(pytz.timezone('Asia/Manila')).date()
+
+
+def _insert(model=DailyStats, dialect=None):
+    """Dialect insert() that supports ON CONFLICT (SQLite and PostgreSQL)."""
+    if (dialect or db.engine.dialect).name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+# ========================================
+# INCREMENTAL UPDATES (caller commits)
+# ========================================
+def bump(day, member_type, plan_type, **deltas):
+    """Add deltas to one rollup row, creating it if needed, in the caller's transaction."""
+    if not any(deltas.values()):
+        return
+    values = {counter: deltas.get(counter, 0) for counter in COUNTERS}
+    stmt = _insert().values(day=day, member_type=member_type, plan_type=plan_type, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['day', 'member_type', 'plan_type'],
+        set_={
+            counter: getattr(DailyStats, counter) + stmt.excluded[counter]
+            for counter, delta in deltas.items() if delta
+        }
+    )
+    db.session.execute(stmt)
+
+
+def record_registration(member):
+    """Count a new member (their status is still unset before the first flush)."""
+    bump(
+        _today(), member.member_type, member.gym_plan,
+        registrations=1,
+        active_delta=1 if member.status == 'Active' else 0
+    )
+
+
+def record_payment(payment):
+    paid_on = payment.paid_at.date() if payment.paid_at else _today()
+    bump(paid_on, payment.member_type, payment.plan_type, revenue=payment.amount)
+
+
+def record_status_change(before, after):
+    """Move a member's Active contribution; before/after are (status, member_type, gym_plan)."""
+    if before == after:
+        return
+    today = _today()
+    if before[0] == 'Active':
+        bump(today, before[1], before[2], active_delta=-1)
+    if after[0] == 'Active':
+        bump(today, after[1], after[2], active_delta=1)
+
+
+def record_check_in(member_id, day):
+    """Single INSERT ... SELECT upsert; the member's type/plan are read in SQL."""
+    source = (
+        db.select(
+            db.literal(day, db.Date),
+            Member.member_type,
+            Member.gym_plan,
+            db.literal(1)
+        )
+        .where(Member.member_id == member_id)
+    )
+    stmt = _insert().from_select(['day', 'member_type', 'plan_type', 'check_ins'], source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['day', 'member_type', 'plan_type'],
+        set_={'check_ins': DailyStats.check_ins + 1}
+    )
+    db.session.execute(stmt)
+
+
+def record_renewal_request(member):
+    bump(_today(), member.member_type, member.gym_plan, renewal_requests=1)
+
+
+def member_key(member):
+    return (member.status, member.member_type, member.gym_plan)
+
+
+# ========================================
+# PER-MEMBER COUNTERS (member_stats)
+# ========================================
+def bump_member(member_id, last_workout_at=None, connection=None, **deltas):
+    """Upsert one member_stats row: add deltas, keep the latest last_workout_at."""
+    values = {'total_workouts': 0, 'total_minutes': 0, 'attendance_days': 0, **deltas}
+    executor = connection or db.session
+    stmt = _insert(MemberStats, getattr(connection, 'dialect', None)).values(
+        member_id=member_id, last_workout_at=last_workout_at, **values
+    )
+    set_ = {name: getattr(MemberStats, name) + stmt.excluded[name] for name, delta in deltas.items() if delta}
+    if last_workout_at is not None:
+        set_['last_workout_at'] = db.case(
+            (MemberStats.last_workout_at.is_(None), stmt.excluded.last_workout_at),
+            (stmt.excluded.last_workout_at > MemberStats.last_workout_at, stmt.excluded.last_workout_at),
+            else_=MemberStats.last_workout_at
+        )
+    if not set_:
+        return
+    executor.execute(stmt.on_conflict_do_update(index_elements=['member_id'], set_=set_))
+
+
+def record_attendance_day(member_id):
+    """Count a new attendance row (one per member per day), in the caller's transaction."""
+    bump_member(member_id, attendance_days=1)
+
+
+# Workouts are counted from mapper events so every ORM writer keeps the
+# counters in the same transaction as the workout row itself
+@event.listens_for(Workout, 'after_insert')
+def _workout_inserted(mapper, connection, workout):
+    bump_member(
+        workout.member_id, last_workout_at=workout.workout_date, connection=connection,
+        total_workouts=1, total_minutes=workout.duration_minutes or 0
+    )
+
+
+@event.listens_for(Workout, 'after_delete')
+def _workout_deleted(mapper, connection, workout):
+    latest = (
+        db.select(func.max(Workout.workout_date))
+        .where(Workout.member_id == workout.member_id)
+        .scalar_subquery()
+    )
+    connection.execute(
+        db.update(MemberStats)
+        .where(MemberStats.member_id == workout.member_id)
+        .values(
+            total_workouts=MemberStats.total_workouts - 1,
+            total_minutes=MemberStats.total_minutes - (workout.duration_minutes or 0),
+            last_workout_at=latest
+        )
+    )
+
+
+def rebuild_member_stats():
+    """Recompute member_stats for every member with two grouped scans; commits."""
+    workouts = (
+        db.select(
+            Workout.member_id,
+            func.count().label('total_workouts'),
+            func.sum(Workout.duration_minutes).label('total_minutes'),
+            func.max(Workout.workout_date).label('last_workout_at')
+        )
+        .group_by(Workout.member_id)
+        .subquery()
+    )
+    attendance = (
+        db.select(AttendanceLog.member_id, func.count(func.distinct(AttendanceLog.date)).label('days'))
+        .where(AttendanceLog.time_in.is_not(None))
+        .group_by(AttendanceLog.member_id)
+        .subquery()
+    )
+    source = (
+        db.select(
+            Member.member_id,
+            func.coalesce(workouts.c.total_workouts, 0),
+            func.coalesce(workouts.c.total_minutes, 0),
+            func.coalesce(attendance.c.days, 0),
+            workouts.c.last_workout_at
+        )
+        .outerjoin(workouts, workouts.c.member_id == Member.member_id)
+        .outerjoin(attendance, attendance.c.member_id == Member.member_id)
+    )
+
+    db.session.query(MemberStats).delete()
+    result = db.session.execute(
+        db.insert(MemberStats).from_select(
+            ['member_id', 'total_workouts', 'total_minutes', 'attendance_days', 'last_workout_at'], source
+        )
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+# ========================================
+# DASHBOARD READS
+# ========================================
+def month_buckets(now, months):
+    """Calendar months ending with the current one, oldest first, as (year, month)."""
+    buckets = []
+    for i in range(months - 1, -1, -1):
+        year, month = divmod(now.year * 12 + now.month - 1 - i, 12)
+        buckets.append((year, month + 1))
+    return buckets
+
+
+def _month_end(year, month):
+    year, month = divmod(year * 12 + month, 12)  # the following month
+    return date(year, month + 1, 1) - timedelta(days=1)
+
+
+def _month_totals(counter, window_start):
+    # Summed per day in SQL and folded into months here: no dialect-specific
+    # date formatting, and the window is at most a few hundred rows
+    totals = {}
+    for day, member_type, total in (
+        db.session.query(DailyStats.day, DailyStats.member_type, func.sum(getattr(DailyStats, counter)))
+        .filter(DailyStats.day >= window_start)
+        .group_by(DailyStats.day, DailyStats.member_type)
+    ):
+        key = (_as_date(day).strftime('%Y-%m'), member_type)
+        totals[key] = totals.get(key, 0) + (total or 0)
+    return totals
+
+
+def registrations_by_month(buckets):
+    """{(YYYY-MM, member_type): registrations} for the given month buckets."""
+    return _month_totals('registrations', date(buckets[0][0], buckets[0][1], 1))
+
+
+def active_by_type():
+    """{member_type: current Active members}: the running total of active_delta."""
+    return {
+        member_type: int(total or 0)
+        for member_type, total in (
+            db.session.query(DailyStats.member_type, func.sum(DailyStats.active_delta))
+            .group_by(DailyStats.member_type)
+        )
+    }
+
+
+def active_by_month_query(ranges):
+    columns = [
+        func.sum(db.case((db.and_(Member.start_date <= last, Member.end_date >= first), 1), else_=0))
+        for first, last in ranges
+    ]
+    return (
+        db.session.query(Member.member_type, *columns)
+        .filter(Member.status == 'Active',
+                Member.start_date <= ranges[-1][1], Member.end_date >= ranges[0][0])
+        .group_by(Member.member_type)
+    )
+
+
+def active_by_month(buckets, member_types):
+    """Active members whose start/end period overlaps each bucket, per type,
+    as {member_type: [counts]}; one conditional-count query for all buckets.
+
+    Read from members, not daily_stats: the rollup only has the net Active
+    change per day, which cannot tell which periods overlap a month. The
+    query is limited to Active members overlapping the 6-month window.
+    """
+    ranges = [(date(year, month, 1), _month_end(year, month)) for year, month in buckets]
+    counts = {member_type: totals for member_type, *totals in active_by_month_query(ranges)}
+    return {
+        member_type: [int(total or 0) for total in counts.get(member_type, [0] * len(ranges))]
+        for member_type in member_types
+    }
+
+
+def revenue_by_day_query(first_day):
+    return (
+        db.session.query(DailyStats.day, func.sum(DailyStats.revenue))
+        .filter(DailyStats.day >= first_day)
+        .group_by(DailyStats.day)
+    )
+
+
+def revenue_by_day(first_day):
+    """{YYYY-MM-DD: revenue} from first_day onwards."""
+    return {
+        (day if isinstance(day, str) else day.isoformat()): float(total or 0)
+        for day, total in revenue_by_day_query(first_day)
+    }
+
+
+# ========================================
+# FULL REBUILD (backfill from history)
+# ========================================
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def rebuild_daily_stats():
+    """Recompute every rollup row from members, payments, attendance and renewals.
+
+    Past status changes are not stored anywhere, so active_delta cannot be
+    rebuilt day by day: current Active members are attributed to their
+    registration day. Only the running total is meaningful; the dashboard
+    reads it as the current Active count per type (active_by_type).
+
+    Two dashboard series still read members, at the cost of one pass over
+    the members index on every uncached call. The status breakdown uses
+    ix_members_status_payment, because only Active changes are counted here.
+    The 6-month Active chart uses the Active members overlapping the window,
+    because it needs each member's start/end period (see active_by_month).
+    """
+    rows = {}
+
+    def add(day, member_type, plan_type, counter, value):
+        key = (_as_date(day), member_type, plan_type)
+        row = rows.setdefault(key, dict.fromkeys(COUNTERS, 0))
+        row[counter] += value or 0
+
+    registered_on = func.date(Member.date_registered)
+    for day, member_type, plan_type, count, active in (
+        db.session.query(
+            registered_on, Member.member_type, Member.gym_plan,
+            func.count(Member.member_id),
+            func.sum(db.case((Member.status == 'Active', 1), else_=0))
+        )
+        .filter(Member.date_registered.is_not(None))
+        .group_by(registered_on, Member.member_type, Member.gym_plan)
+    ):
+        add(day, member_type, plan_type, 'registrations', count)
+        add(day, member_type, plan_type, 'active_delta', active)
+
+    paid_on = func.date(Payment.paid_at)
+    for day, member_type, plan_type, total in (
+        db.session.query(paid_on, Payment.member_type, Payment.plan_type, func.sum(Payment.amount))
+        .group_by(paid_on, Payment.member_type, Payment.plan_type)
+    ):
+        add(day, member_type, plan_type, 'revenue', total)
+
+    for day, member_type, plan_type, count in (
+        db.session.query(AttendanceLog.date, Member.member_type, Member.gym_plan, func.count())
+        .join(Member, AttendanceLog.member_id == Member.member_id)
+        .filter(AttendanceLog.time_in.is_not(None))
+        .group_by(AttendanceLog.date, Member.member_type, Member.gym_plan)
+    ):
+        add(day, member_type, plan_type, 'check_ins', count)
+
+    requested_on = func.date(RenewalRequest.request_date)
+    for day, member_type, plan_type, count in (
+        db.session.query(requested_on, Member.member_type, Member.gym_plan, func.count())
+        .join(Member, RenewalRequest.member_id == Member.member_id)
+        .group_by(requested_on, Member.member_type, Member.gym_plan)
+    ):
+        add(day, member_type, plan_type, 'renewal_requests', count)
+
+    db.session.query(DailyStats).delete()
+    if rows:
+        db.session.execute(
+            db.insert(DailyStats),
+            [
+                {"day": day, "member_type": member_type, "plan_type": plan_type, **counters}
+                for (day, member_type, plan_type), counters in rows.items()
+            ]
+        )
+    db.session.commit()
+    return len(rows)
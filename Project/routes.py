@@ -1,13 +1,14 @@
 from flask import Blueprint, render_template, request, session, redirect, url_for, flash, jsonify
 from . import db
 from .models import Admin
+from .pricing import prices
 import pytz
 
 main = Blueprint('main', __name__)
 
 @main.route('/')
 def index():
-    return render_template('admin/index.html')
+    return render_template('admin/index.html', price=prices.price)
 
 @main.route('/NwSSU/About/Us')
 def aboutUs():
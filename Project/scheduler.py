@@ -0,0 +1,97 @@
+import os
+import threading
+from datetime import datetime, timedelta
+import pytz
+from . import db
+from .models import JobRun
+
+EXPIRY_JOB = 'expire-members'
+TZ = pytz.timezone('Asia/Manila')
+
+
+def _now():
+    # Naive Manila time, matching how DateTime columns are stored
+    return datetime.now(TZ).replace(tzinfo=None)
+
+
+def expiry_sweep_due(interval):
+    """Due when it never ran, has not run since local midnight, or the interval elapsed."""
+    last = db.session.get(JobRun, EXPIRY_JOB)
+    if last is None:
+        return True
+    now = _now()
+    return last.last_run_at.date() < now.date() or now - last.last_run_at >= timedelta(seconds=interval)
+
+
+def run_expiry_sweep():
+    """Run the expiry sweep once and record it in job_runs (needs an app context)."""
+    from .addMember import auto_update_expired_members
+
+    result = auto_update_expired_members()
+    db.session.merge(JobRun(
+        name=EXPIRY_JOB,
+        last_run_at=_now(),
+        last_result=f"{result['expired']} expired in {result['batches']} batches ({result['elapsed_ms']} ms)"
+    ))
+    db.session.commit()
+    return result
+
+
+# ========================================
+# IN-PROCESS SCHEDULER
+# ========================================
+class ExpiryScheduler:
+    """Daemon thread that runs the expiry sweep every EXPIRY_SWEEP_INTERVAL
+    seconds and right after local midnight (Asia/Manila).
+
+    The thread starts with the first request, so the reloader's parent
+    process and CLI commands never start one. Several worker processes
+    may each run a thread; job_runs makes them skip runs that are not due.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('EXPIRY_SCHEDULER_ENABLED', os.environ.get('EXPIRY_SCHEDULER', '1') == '1')
+        app.config.setdefault('EXPIRY_SWEEP_INTERVAL', int(os.environ.get('EXPIRY_SWEEP_INTERVAL', 3600)))
+        self.app = app
+        app.extensions['expiry_scheduler'] = self
+
+        if app.config['EXPIRY_SCHEDULER_ENABLED']:
+            app.before_request(self.start)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='expiry-scheduler', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _seconds_until_next_run(self):
+        now = datetime.now(TZ)
+        midnight = TZ.localize(datetime(now.year, now.month, now.day) + timedelta(days=1))
+        return min(self.app.config['EXPIRY_SWEEP_INTERVAL'], (midnight - now).total_seconds() + 1)
+
+    def _run(self):
+        interval = self.app.config['EXPIRY_SWEEP_INTERVAL']
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    if expiry_sweep_due(interval):
+                        run_expiry_sweep()
+            except Exception:
+                self.app.logger.exception("Expiry sweep failed")
+            self._stop.wait(self._seconds_until_next_run())
+
+
+scheduler = ExpiryScheduler()
@@ -116,42 +116,47 @@
         const closeEditBtn = document.getElementById('closeEditModalBtn');
         const editForm = document.getElementById('editMemberForm');
 
-        const viewButtons = document.querySelectorAll('.table-btn.view');
-        const editButtons = document.querySelectorAll('.table-btn.edit');
-        const deleteButtons = document.querySelectorAll('.table-btn.delete');
+        const memberTableBody = document.getElementById('memberTableBody');
+
+        // Delegated from the table body: tables.js replaces the rows on every page load
+        const onMemberAction = (selector, handler) => {
+            if (!memberTableBody) return;
+            memberTableBody.addEventListener('click', e => {
+                const btn = e.target.closest(selector);
+                if (btn) handler(btn);
+            });
+        };
 
         // ========== VIEW ==========
-        viewButtons.forEach(btn => {
-            btn.addEventListener('click', async () => {
-                const memberId = btn.dataset.id;
-                try {
-                    // Fetch member data from python route
-                    const res = await fetch(`/admin/member/${memberId}`);
-                    if (!res.ok) throw new Error('Failed to fetch member data');
-                    const data = await res.json();
-
-                    // Fill users modal data
-                    document.getElementById('infoName').textContent = `${data.first_name} ${data.last_name}`;
-                    document.getElementById('infoMemberId').textContent = `Member ID: ${data.unique_code}`;
-                    document.getElementById('infoAge').textContent = data.age || '—';
-                    document.getElementById('infoGender').textContent = data.gender || '—';
-                    document.getElementById('infoType').textContent = data.member_type;
-                    document.getElementById('infoPlan').textContent = data.gym_plan;
-                    document.getElementById('infoEmail').textContent = data.email || '—';
-                    document.getElementById('infoContact').textContent = data.contact_number || '—';
-                    document.getElementById('infoAddress').textContent = data.address || '—';
-                    document.getElementById('infoStart').textContent = data.start_date;
-                    document.getElementById('infoEnd').textContent = data.end_date;
-                    document.getElementById('infoStatus').textContent = data.status;
-                    document.getElementById('infoPayment').textContent = data.payment_status;
-
-                    memberModal.style.display = 'flex';
-                    memberModal.setAttribute('aria-hidden', 'false');
-                } catch (err) {
-                    console.error(err);
-                    alert('Error loading member information.');
-                }
-            });
+        onMemberAction('.table-btn.view', async btn => {
+            const memberId = btn.dataset.id;
+            try {
+                // Fetch member data from python route
+                const res = await fetch(`/admin/member/${memberId}`);
+                if (!res.ok) throw new Error('Failed to fetch member data');
+                const data = await res.json();
+
+                // Fill users modal data
+                document.getElementById('infoName').textContent = `${data.first_name} ${data.last_name}`;
+                document.getElementById('infoMemberId').textContent = `Member ID: ${data.unique_code}`;
+                document.getElementById('infoAge').textContent = data.age || '—';
+                document.getElementById('infoGender').textContent = data.gender || '—';
+                document.getElementById('infoType').textContent = data.member_type;
+                document.getElementById('infoPlan').textContent = data.gym_plan;
+                document.getElementById('infoEmail').textContent = data.email || '—';
+                document.getElementById('infoContact').textContent = data.contact_number || '—';
+                document.getElementById('infoAddress').textContent = data.address || '—';
+                document.getElementById('infoStart').textContent = data.start_date;
+                document.getElementById('infoEnd').textContent = data.end_date;
+                document.getElementById('infoStatus').textContent = data.status;
+                document.getElementById('infoPayment').textContent = data.payment_status;
+
+                memberModal.style.display = 'flex';
+                memberModal.setAttribute('aria-hidden', 'false');
+            } catch (err) {
+                console.error(err);
+                alert('Error loading member information.');
+            }
         });
 
         // Close View Button
@@ -170,36 +175,34 @@
 
 
         // ========== EDIT ==========
-        editButtons.forEach(btn => {
-            btn.addEventListener('click', async () => {
-                const id = btn.dataset.id;
+        onMemberAction('.table-btn.edit', async btn => {
+            const id = btn.dataset.id;
 
-                // Fetch member data from python route
-                const res = await fetch(`/admin/member/${id}`);
-                if (!res.ok) return alert('Failed to fetch member data');
-                const data = await res.json();
+            // Fetch member data from python route
+            const res = await fetch(`/admin/member/${id}`);
+            if (!res.ok) return alert('Failed to fetch member data');
+            const data = await res.json();
 
-                // Store the member ID in hidden input
-                document.getElementById('editHiddenId').value = id;
-
-                // Fill users modal data and chnage the value
-                document.getElementById('editFirstName').value = data.first_name;
-                document.getElementById('editLastName').value = data.last_name;
-                document.getElementById('editAge').value = data.age || '';
-                document.getElementById('editGender').value = data.gender || 'Male';
-                document.getElementById('editPlan').value = data.gym_plan;
-                document.getElementById('editEmail').value = data.email || '';
-                document.getElementById('editContact').value = data.contact_number || '';
-                document.getElementById('editAddress').value = data.address || '';
-                document.getElementById('editStart').value = data.start_date;
-                document.getElementById('editEnd').value = data.end_date;
-                document.getElementById('editStatus').value = data.status;
-                document.getElementById('paymentStatus').value = data.payment_status;
-
-                // Open modal
-                editModal.style.display = 'flex';
-                editModal.setAttribute('aria-hidden', 'false');
-            });
+            // Store the member ID in hidden input
+            document.getElementById('editHiddenId').value = id;
+
+            // Fill users modal data and chnage the value
+            document.getElementById('editFirstName').value = data.first_name;
+            document.getElementById('editLastName').value = data.last_name;
+            document.getElementById('editAge').value = data.age || '';
+            document.getElementById('editGender').value = data.gender || 'Male';
+            document.getElementById('editPlan').value = data.gym_plan;
+            document.getElementById('editEmail').value = data.email || '';
+            document.getElementById('editContact').value = data.contact_number || '';
+            document.getElementById('editAddress').value = data.address || '';
+            document.getElementById('editStart').value = data.start_date;
+            document.getElementById('editEnd').value = data.end_date;
+            document.getElementById('editStatus').value = data.status;
+            document.getElementById('paymentStatus').value = data.payment_status;
+
+            // Open modal
+            editModal.style.display = 'flex';
+            editModal.setAttribute('aria-hidden', 'false');
         });
 
         // Close Edit Button
@@ -255,56 +258,24 @@
         }
 
         // ========== DELETE ==========
-        deleteButtons.forEach(btn => {
-            btn.addEventListener('click', async () => {
-                const id = btn.dataset.id;
-                if (!confirm('Are you sure you want to delete this member?')) return;
-                const res = await fetch(`/admin/member/${id}/delete`, { method: 'DELETE' });
-                const result = await res.json();
-
-                if (result.success) {
-                    alert('Member deleted!');
-                    location.reload();
-                } else {
-                    alert(result.error);
-                }
-            });
+        onMemberAction('.table-btn.delete', async btn => {
+            const id = btn.dataset.id;
+            if (!confirm('Are you sure you want to delete this member?')) return;
+            const res = await fetch(`/admin/member/${id}/delete`, { method: 'DELETE' });
+            const result = await res.json();
+
+            if (result.success) {
+                alert('Member deleted!');
+                location.reload();
+            } else {
+                alert(result.error);
+            }
         });
 
         // ========== Refresh Registered Members Table ==========
+        // Reloads the current page through tables.js (keyset-paginated /admin/members-json)
         async function refreshMemberTable() {
-            const res = await fetch("/admin/members-json");
-            const data = await res.json();
-            const tableBody = document.getElementById("memberTableBody");
-
-            tableBody.innerHTML = ""; // Clear old rows
-
-            data.members.forEach(member => {
-                const row = document.createElement("tr");
-                row.innerHTML = `
-                    <td>${member.unique_code}</td>
-                    <td>${member.first_name} ${member.last_name}</td>
-                    <td>${member.member_type}</td>
-                    <td>${member.gym_plan}</td>
-                    <td>${member.status}</td>
-                    <td>${member.payment_status}</td>
-                    <td>
-                        <button class="table-btn view" data-id="${member.member_id}">
-                            <i class="fas fa-eye"></i>
-                        </button>
-                        <button class="table-btn edit" data-id="${member.member_id}">
-                            <i class="fas fa-pen"></i>
-                        </button>
-                        <button class="table-btn delete" data-id="${member.member_id}">
-                            <i class="fas fa-trash"></i>
-                        </button>
-                    </td>
-                `;
-                tableBody.appendChild(row);
-            });
-
-            // Reattach button listeners so new rows work too
-            attachMemberActionButtons();
+            if (window.reloadMemberPage) await window.reloadMemberPage();
         }
 
         // ========== Refresh Renewal Requests Table ==========
@@ -362,44 +333,12 @@
 
 
 
-        function attachMemberActionButtons() {
-            document.querySelectorAll('.table-btn.edit').forEach(btn => {
-                btn.addEventListener('click', async () => {
-                    const id = btn.dataset.id; 
-                    const res = await fetch(`/admin/member/${id}`);
-                    if (!res.ok) return alert('Failed to fetch member data');
-                    const data = await res.json();
-
-                    // get and show edit modal
-                    document.getElementById('editMemberId').value = data.member_id;
-                    document.getElementById('editFirstName').value = data.first_name;
-                    document.getElementById('editLastName').value = data.last_name;
-                    document.getElementById('editType').value = data.member_type;
-                    document.getElementById('editPlan').value = data.gym_plan;
-                    document.getElementById('editStatus').value = data.status;
-                    document.getElementById('paymentStatus').value = data.status;
-                    editModal.style.display = 'flex';
-                });
-            });
-
-            // 
-            document.querySelectorAll('.table-btn.delete').forEach(btn => {
-                btn.addEventListener('click', async () => {
-                    const id = btn.dataset.id;
-                    if (!confirm('Are you sure you want to delete this member?')) return;
-                    const res = await fetch(`/admin/member/${id}/delete`, { method: 'DELETE' });
-                    const result = await res.json();
-                    if (result.success) {
-                        alert('Member deleted!');
-                        await refreshMemberTable();
-                        await refreshDashboardSummary();
-                    } else {
-                        alert(result.error);
-                    }
-                });
-            });
+        // New requests arrive over the live stream (statistics.js)
+        if (document.getElementById("renewalTableBody")) {
+            window.addEventListener("live:renewal_request", refreshRenewalTable);
         }
 
+
         /* ==========================
         HANDLE RENEWAL REQUEST APPROVE / DENY
         ========================== */
@@ -37,6 +37,7 @@ document.addEventListener("DOMContentLoaded", () => {
     let expirationChart = null;
     let paymentChartInstance = null;
     let weeklyRevenueChart = null;
+    let logActivityChart = null;
 
     // ===========================================================
     // UPDATE MEMBER SUMMARY (SAFE FOR ANY PAGE)
@@ -243,10 +244,13 @@ document.addEventListener("DOMContentLoaded", () => {
     // ===========================================================
     // FETCH DASHBOARD STATISTICS
     // ===========================================================
-    fetch("/admin/statistics-summary")
-        .then(res => res.json())
-        .then(initCharts)
-        .catch(err => console.error("Dashboard load failed:", err));
+    const loadSummary = () =>
+        fetch("/admin/statistics-summary")
+            .then(res => res.json())
+            .then(initCharts)
+            .catch(err => console.error("Dashboard load failed:", err));
+
+    loadSummary();
 
     // ===========================================================
     // FETCH MEMBERSHIP LOGS
@@ -254,16 +258,20 @@ document.addEventListener("DOMContentLoaded", () => {
     const logList = document.getElementById("logList");
     const timestamp = document.getElementById("revenueTimestamp");
 
-    if (logList) {
-        fetch("/admin/membership-logs")
+    // One page at a time (keyset cursor); "Load more" appends the next page
+    const loadLogs = (cursor = null) => {
+        if (!logList) return;
+        const url = cursor ? `/admin/membership-logs?cursor=${encodeURIComponent(cursor)}` : "/admin/membership-logs";
+        fetch(url)
             .then(res => res.json())
             .then(data => {
-                logList.innerHTML = "";
-                if (!data || !data.length) {
+                if (!cursor) logList.innerHTML = "";
+                logList.querySelector(".log-more")?.remove();
+                if (!cursor && (!data || !data.logs || !data.logs.length)) {
                     logList.innerHTML = "<li class='log-empty'>No logs for the past 7 days.</li>";
                     return;
                 }
-                data.forEach(log => {
+                data.logs.forEach(log => {
                     const li = document.createElement("li");
                     li.className = "log-item";
                     li.innerHTML = `
@@ -275,7 +283,14 @@ document.addEventListener("DOMContentLoaded", () => {
                     `;
                     logList.appendChild(li);
                 });
-                if (timestamp) {
+                if (data.has_more) {
+                    const more = document.createElement("li");
+                    more.className = "log-item log-more";
+                    more.innerHTML = "<button type='button' class='table-btn'>Load more</button>";
+                    more.querySelector("button").addEventListener("click", () => loadLogs(data.next_cursor));
+                    logList.appendChild(more);
+                }
+                if (timestamp && !cursor) {
                     timestamp.textContent = `Last updated: ${new Date().toLocaleString("en-PH", { hour12: true })}`;
                 }
             })
@@ -283,6 +298,80 @@ document.addEventListener("DOMContentLoaded", () => {
                 console.error("Log loading failed:", err);
                 logList.innerHTML = "<li class='log-error'>Failed to load logs.</li>";
             });
+    };
+
+    loadLogs();
+
+    // Per-day counts per action type come aggregated from the server
+    // (?mode=daily), so the chart never needs the raw log rows
+    const LOG_COLORS = ["#00c8ff", "#ffd700", "#ff5078", "#00ffb0", "#b388ff", "#ff9f40"];
+    const loadLogActivity = () => {
+        const ctx = document.getElementById("logActivityChart")?.getContext("2d");
+        if (!ctx) return;
+        fetch("/admin/membership-logs?mode=daily")
+            .then(res => res.json())
+            .then(data => {
+                logActivityChart?.destroy();
+                logActivityChart = new Chart(ctx, {
+                    type: "bar",
+                    data: {
+                        labels: data.labels,
+                        datasets: Object.entries(data.counts).map(([actionType, counts], i) => ({
+                            label: actionType,
+                            data: counts,
+                            backgroundColor: LOG_COLORS[i % LOG_COLORS.length],
+                            borderRadius: 6
+                        }))
+                    },
+                    options: {
+                        ...chartOptions(),
+                        scales: {
+                            x: { ...chartOptions().scales.x, stacked: true },
+                            y: { ...chartOptions().scales.y, stacked: true, ticks: { color: "#00ffe0", precision: 0 } }
+                        }
+                    }
+                });
+            })
+            .catch(err => console.error("Log activity load failed:", err));
+    };
+
+    loadLogActivity();
+
+    // ===========================================================
+    // LIVE UPDATES (SERVER-SENT EVENTS)
+    // Only the documents an event touches are re-fetched; occupancy
+    // is patched in place. Events are re-dispatched on window as
+    // "live:<name>" for other scripts (e.g. members.js).
+    // ===========================================================
+    const occupancyEl = document.getElementById("occupancyDisplay");
+    const needsLive = occupancyEl || logList || document.querySelector(".statistics-summary, .member-summary")
+        || document.getElementById("renewalTableBody");
+
+    if (needsLive && window.EventSource) {
+        const source = new EventSource("/admin/live/stream");
+        const setOccupancy = count => {
+            if (occupancyEl) occupancyEl.textContent = count.toLocaleString();
+        };
+
+        source.addEventListener("occupancy", e => setOccupancy(JSON.parse(e.data).count));
+        source.addEventListener("check_in", e => setOccupancy(JSON.parse(e.data).count));
+        source.addEventListener("check_out", e => setOccupancy(JSON.parse(e.data).count));
+
+        source.addEventListener("dashboard", e => {
+            const { tags } = JSON.parse(e.data);
+            loadSummary();
+            if (tags.includes("payments") || tags.includes("pricing")) loadRevenueStats();
+            if (tags.includes("members") || tags.includes("renewals")) {
+                loadLogs();
+                loadLogActivity();
+            }
+        });
+
+        ["occupancy", "check_in", "check_out", "dashboard", "renewal_request"].forEach(name =>
+            source.addEventListener(name, e =>
+                window.dispatchEvent(new CustomEvent(`live:${name}`, { detail: JSON.parse(e.data) }))
+            )
+        );
     }
 
 });
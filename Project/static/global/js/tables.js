@@ -1,109 +1,150 @@
 document.addEventListener("DOMContentLoaded", () => {
 
     /* ============================================================
-        REGISTERED MEMBERS — FILTERS + PAGINATION
+        REGISTERED MEMBERS — SERVER-SIDE FILTERS + KEYSET PAGINATION
     ============================================================ */
 
-    const filterID = document.getElementById("filterID");
-    const filterType = document.getElementById("filterType");
-    const filterPlan = document.getElementById("filterPlan");
-    const filterStatus = document.getElementById("filterStatus");
-    const tableRows = document.querySelectorAll(".registered-member-table tbody tr");
+    const memberTableBody = document.getElementById("memberTableBody");
 
-    const rowsPerPage = 10;
-    let currentPage = 1;
-    let filteredRows = Array.from(tableRows);
+    // tables.js is also loaded on pages without the members table
+    if (memberTableBody) {
+        const filterID = document.getElementById("filterID");
+        const filterType = document.getElementById("filterType");
+        const filterPlan = document.getElementById("filterPlan");
+        const filterStatus = document.getElementById("filterStatus");
 
-    function applyMemberFilters() {
-        const idValue = filterID.value.toLowerCase();
-        const typeValue = filterType.value;
-        const planValue = filterPlan.value;
-        const statusValue = filterStatus.value;
+        const rowsPerPage = 10;
+        let currentPage = 1;
+        let pageCursors = [null];   // cursor that loads each visited page (page 1 has none)
+        let hasNextPage = false;
+        let filterTimer = null;
 
-        filteredRows = Array.from(tableRows).filter(row => {
-            const id = row.cells[0].textContent.toLowerCase();
-            const type = row.cells[2].textContent;
-            const plan = row.cells[3].textContent;
-            const status = row.cells[4].textContent;
-
-            return (
-                id.includes(idValue) &&
-                (!typeValue || type === typeValue) &&
-                (!planValue || plan === planValue) &&
-                (!statusValue || status === statusValue)
-            );
-        });
+        function memberPageUrl(cursor) {
+            const params = new URLSearchParams({ limit: rowsPerPage });
+            const code = filterID.value.trim();
 
-        currentPage = 1;
-        updateMemberPagination();
-    }
-
-    function updateMemberPagination() {
-        const totalPages = Math.ceil(filteredRows.length / rowsPerPage);
-        const tableBody = document.getElementById("memberTableBody");
+            if (code) params.set("code", code);
+            if (filterType.value) params.set("member_type", filterType.value);
+            if (filterPlan.value) params.set("gym_plan", filterPlan.value);
+            if (filterStatus.value) params.set("status", filterStatus.value);
+            if (cursor) params.set("cursor", cursor);
 
-        tableBody.classList.add("fade-out");
+            return `/admin/members-json?${params}`;
+        }
 
-        setTimeout(() => {
-            tableRows.forEach(row => (row.style.display = "none"));
+        // Cells are filled with textContent: names and contacts are user input
+        function textCell(text, className) {
+            const cell = document.createElement("td");
+            cell.textContent = text;
+            if (className) cell.className = className;
+            return cell;
+        }
 
-            const start = (currentPage - 1) * rowsPerPage;
-            const end = start + rowsPerPage;
-            filteredRows.slice(start, end).forEach(row => (row.style.display = ""));
+        function renderMemberRow(member) {
+            const row = document.createElement("tr");
+            row.append(
+                textCell(member.unique_code),
+                textCell(`${member.first_name} ${member.last_name}`),
+                textCell(member.member_type),
+                textCell(member.gym_plan),
+                textCell(member.status, member.status === "Active" ? "active-status" : "inactive-status"),
+                textCell(member.payment_status, member.payment_status === "Paid" ? "active-status" : "inactive-status")
+            );
 
-            renderMemberPageNumbers(totalPages);
+            const actions = document.createElement("td");
+            actions.id = "table-btn";
+            actions.className = "table-actions";
+            ["view", "edit", "delete"].forEach(action => {
+                const btn = document.createElement("button");
+                btn.className = `table-btn ${action}`;
+                btn.dataset.id = member.member_id;
+                const label = document.createElement("h6");
+                label.textContent = action;
+                btn.appendChild(label);
+                actions.appendChild(btn);
+            });
+            row.appendChild(actions);
+            return row;
+        }
 
-            tableBody.classList.remove("fade-out");
-            tableBody.classList.add("fade-in");
+        async function loadMemberPage(page) {
+            memberTableBody.classList.add("fade-out");
+
+            try {
+                const res = await fetch(memberPageUrl(pageCursors[page - 1]));
+                const data = await res.json();
+                if (!res.ok) throw new Error(data.error || "Failed to load members");
+
+                currentPage = page;
+                hasNextPage = data.has_more;
+                pageCursors = pageCursors.slice(0, page);
+                if (data.next_cursor) pageCursors.push(data.next_cursor);
+
+                memberTableBody.innerHTML = "";
+                if (!data.members.length) {
+                    memberTableBody.innerHTML =
+                        `<tr><td colspan="7" style="text-align:center; color:#888;">No members found</td></tr>`;
+                }
+                data.members.forEach(member => memberTableBody.appendChild(renderMemberRow(member)));
+
+                renderMemberPageNumbers();
+            } catch (err) {
+                console.error("Member page load failed:", err);
+                memberTableBody.innerHTML =
+                    `<tr><td colspan="7" style="text-align:center; color:#888;">Failed to load members</td></tr>`;
+            }
+
+            memberTableBody.classList.remove("fade-out");
+            memberTableBody.classList.add("fade-in");
+            setTimeout(() => memberTableBody.classList.remove("fade-in"), 300);
+        }
 
-            setTimeout(() => tableBody.classList.remove("fade-in"), 300);
-        }, 200);
-    }
+        // Keyset pages can only be reached through their cursor, so only pages
+        // already visited (plus the next one) get a number button.
+        function renderMemberPageNumbers() {
+            const pageNumbersDiv = document.getElementById("pageNumbers");
+            pageNumbersDiv.innerHTML = "";
 
-    function renderMemberPageNumbers(totalPages) {
-        const pageNumbersDiv = document.getElementById("pageNumbers");
-        pageNumbersDiv.innerHTML = "";
+            for (let i = 1; i <= pageCursors.length; i++) {
+                const btn = document.createElement("button");
+                btn.textContent = i;
+                btn.classList.add("page-number");
+                if (i === currentPage) btn.classList.add("active");
 
-        for (let i = 1; i <= totalPages; i++) {
-            const btn = document.createElement("button");
-            btn.textContent = i;
-            btn.classList.add("page-number");
-            if (i === currentPage) btn.classList.add("active");
+                btn.addEventListener("click", () => loadMemberPage(i));
+                pageNumbersDiv.appendChild(btn);
+            }
 
-            btn.addEventListener("click", () => {
-                currentPage = i;
-                updateMemberPagination();
-            });
+            document.getElementById("prevPage").disabled = currentPage === 1;
+            document.getElementById("nextPage").disabled = !hasNextPage;
+        }
 
-            pageNumbersDiv.appendChild(btn);
+        function applyMemberFilters() {
+            clearTimeout(filterTimer);
+            filterTimer = setTimeout(() => {
+                pageCursors = [null];
+                loadMemberPage(1);
+            }, 250);
         }
 
-        document.getElementById("prevPage").disabled = currentPage === 1;
-        document.getElementById("nextPage").disabled =
-            currentPage === totalPages || totalPages === 0;
-    }
+        document.getElementById("prevPage").addEventListener("click", () => {
+            if (currentPage > 1) loadMemberPage(currentPage - 1);
+        });
 
-    document.getElementById("prevPage").addEventListener("click", () => {
-        if (currentPage > 1) {
-            currentPage--;
-            updateMemberPagination();
-        }
-    });
+        document.getElementById("nextPage").addEventListener("click", () => {
+            if (hasNextPage) loadMemberPage(currentPage + 1);
+        });
 
-    document.getElementById("nextPage").addEventListener("click", () => {
-        const totalPages = Math.ceil(filteredRows.length / rowsPerPage);
-        if (currentPage < totalPages) {
-            currentPage++;
-            updateMemberPagination();
-        }
-    });
+        filterID.addEventListener("input", applyMemberFilters);
+        [filterType, filterPlan, filterStatus].forEach(input => {
+            input.addEventListener("change", applyMemberFilters);
+        });
 
-    [filterID, filterType, filterPlan, filterStatus].forEach(input => {
-        input.addEventListener("input", applyMemberFilters);
-        input.addEventListener("change", applyMemberFilters);
-    });
+        // Lets members.js reload the visible page after an edit or delete
+        window.reloadMemberPage = () => loadMemberPage(currentPage);
 
-    applyMemberFilters();
+        loadMemberPage(1);
+    }
 
 
 
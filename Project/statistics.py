@@ -1,175 +1,247 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from . import db
-from .models import Member, MembershipLog
+from .cache import cache
+from .addMember import encode_cursor, decode_cursor
+from .models import Member, MembershipLog, Payment
+from .rollups import month_buckets, registrations_by_month, revenue_by_day
+from .storage import use_read_only
 from datetime import datetime, timedelta
+from sqlalchemy import case, func, tuple_
+import binascii
 import pytz
 
 statistics = Blueprint('statistics', __name__)
 
+# Every route here only aggregates; run them on the read-only bind
+statistics.before_request(use_read_only)
+
+# Timestamp a member's latest payment is attributed to (last_payment_date,
+# falling back to date_registered), used for the member list.
+def paid_at_column():
+    return func.coalesce(Member.last_payment_date, Member.date_registered)
+
+# Revenue per day for the last 7 days (oldest first), read from the daily rollup.
+def weekly_revenue(now):
+    days = [(now - timedelta(days=i)).date() for i in range(6, -1, -1)]
+    totals = revenue_by_day(days[0])
+
+    return {
+        "labels": [day.strftime("%a") for day in days],
+        "values": [totals.get(day.isoformat(), 0) for day in days]
+    }
+
 @statistics.route('/admin/members-statistics', methods=['GET'])
+@cache.cached(tags=('members', 'payments'))
 def get_members_statistics():
     tz = pytz.timezone('Asia/Manila')
     now = datetime.now(tz)
-    start_of_day = tz.localize(datetime(now.year, now.month, now.day))
-    start_of_month = tz.localize(datetime(now.year, now.month, 1))
-
-    members = Member.query.all()
-    total_revenue = daily_revenue = monthly_revenue = 0
-    total_members = len(members)
-    active_members = 0
-
-    # Initialize weekly revenue dictionary (last 7 days)
-    # Inside statistics_summary()
-    # --- WEEKLY REVENUE ---
-    weekly_labels = []
-    weekly_values = []
-    for i in range(6, -1, -1):  # 6 days ago to today
-        day = now - timedelta(days=i)
-        weekly_labels.append(day.strftime("%a"))
-        weekly_values.append(0)
-
-    members = Member.query.all()
-    tz = pytz.timezone("Asia/Manila")
-    for m in members:
-        price = float(m.price_paid or 0)
-        created_at = m.last_payment_date or m.date_registered
-        if created_at.tzinfo is None:
-            created_at = tz.localize(created_at)
-        if m.payment_status == "Paid":
-            for idx, label_date in enumerate([(now - timedelta(days=i)).date() for i in range(6, -1, -1)]):
-                if created_at.date() == label_date:
-                    weekly_values[idx] += price
-
-
-    member_list = []
-    for m in members:
-        price = float(m.price_paid or 0)
-        created_at = m.last_payment_date or m.date_registered
-        payment_status = m.payment_status
-
-        if created_at.tzinfo is None:
-            created_at = tz.localize(created_at)
-
-        # Revenue calculations
-        if payment_status == 'Paid':
-            total_revenue += price
-        if created_at >= start_of_month and payment_status == 'Paid':
-            monthly_revenue += price
-        if created_at >= start_of_day and payment_status == 'Paid':
-            daily_revenue += price
-
-        # Weekly revenue
-        if payment_status == 'Paid':
-            for idx, label_date in enumerate([(now - timedelta(days=i)).date() for i in range(6, -1, -1)]):
-                if created_at.date() == label_date:
-                    weekly_values[idx] += price
-
-        if m.status.lower() == "active":
-            active_members += 1
-
-        member_list.append({
-            "id": m.member_id,
-            "unique_code": m.unique_code,
-            "first_name": m.first_name,
-            "last_name": m.last_name,
-            "price_paid": m.price_paid,
-            "member_type": m.member_type,
-            "gym_plan": m.gym_plan,
-            "status": m.status,
-            "payment_status": m.payment_status,
-            "created_at": created_at.strftime("%Y-%m-%d %H:%M:%S")
-        })
+    # Stored timestamps are naive Manila time, so compare against naive bounds
+    start_of_day = datetime(now.year, now.month, now.day)
+    start_of_month = datetime(now.year, now.month, 1)
+    paid_at = paid_at_column()
 
-    return jsonify({
-        "members": member_list,
+    # --- REVENUE TOTALS (payment ledger) ---
+    total_revenue = db.session.query(func.coalesce(func.sum(Payment.amount), 0)).scalar()
+    monthly_revenue, daily_revenue = (
+        db.session.query(
+            func.coalesce(func.sum(Payment.amount), 0),
+            func.coalesce(func.sum(case((Payment.paid_at >= start_of_day, Payment.amount), else_=0)), 0)
+        )
+        .filter(Payment.paid_at >= start_of_month)
+        .one()
+    )
+
+    # --- MEMBER COUNTS ---
+    status_counts = dict(Member.count_by(Member.status).all())
+
+    response = {
         "stats": {
-            "total_revenue": total_revenue,
-            "monthly_revenue": monthly_revenue,
-            "daily_revenue": daily_revenue,
-            "total_members": total_members,
-            "active_members": active_members
+            "total_revenue": float(total_revenue),
+            "monthly_revenue": float(monthly_revenue),
+            "daily_revenue": float(daily_revenue),
+            "total_members": sum(status_counts.values()),
+            "active_members": status_counts.get("Active", 0)
         },
-        "weekly_revenue": {
-            "labels": weekly_labels,
-            "values": weekly_values
+        "weekly_revenue": weekly_revenue(now)
+    }
+
+    # --- OPTIONAL PAGINATED MEMBER LIST (?include_members=1&page=1&per_page=50) ---
+    if request.args.get('include_members', type=int):
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+
+        rows = (
+            db.session.query(
+                Member.member_id, Member.unique_code, Member.first_name, Member.last_name,
+                Member.price_paid, Member.member_type, Member.gym_plan, Member.status,
+                Member.payment_status, paid_at.label('created_at')
+            )
+            .order_by(Member.member_id)
+            .limit(per_page + 1)
+            .offset((page - 1) * per_page)
+            .all()
+        )
+
+        response["members"] = [
+            {
+                "id": r.member_id,
+                "unique_code": r.unique_code,
+                "first_name": r.first_name,
+                "last_name": r.last_name,
+                "price_paid": r.price_paid,
+                "member_type": r.member_type,
+                "gym_plan": r.gym_plan,
+                "status": r.status,
+                "payment_status": r.payment_status,
+                "created_at": r.created_at.strftime("%Y-%m-%d %H:%M:%S") if r.created_at else None
+            }
+            for r in rows[:per_page]
+        ]
+        response["pagination"] = {
+            "page": page,
+            "per_page": per_page,
+            "has_next": len(rows) > per_page
         }
-    })
 
-@statistics.route('/admin/membership-logs', methods=['GET'])
-def get_membership_logs():
-    tz = pytz.timezone('Asia/Manila')
-    now = datetime.now(tz)
-    one_week_ago = now - timedelta(days=7)
+    return jsonify(response)
+
+# ========================================
+# MEMBERSHIP LOGS
+# ?action_type=a,b&member_id=&date_from=&date_to=&limit=&cursor=   newest first, one page
+# ?mode=daily&...                                                  counts per action_type per day
+# Without date_from/date_to the window is the last 7 days (today included).
+# ========================================
+LOG_PAGE_LIMIT = 200
+LOG_MAX_RANGE_DAYS = 366
+
+def _log_filters(args, today):
+    """(conditions, first day, last day) from the query string; raises ValueError."""
+    date_from = datetime.strptime(args["date_from"], "%Y-%m-%d").date() if args.get("date_from") else None
+    date_to = datetime.strptime(args["date_to"], "%Y-%m-%d").date() if args.get("date_to") else None
+    if date_from is None and date_to is None:
+        date_from, date_to = today - timedelta(days=6), today
+    date_to = date_to or today
+    date_from = date_from or date_to - timedelta(days=6)
+    if date_from > date_to:
+        raise ValueError("date_from must not be after date_to.")
+    if (date_to - date_from).days >= LOG_MAX_RANGE_DAYS:
+        raise ValueError(f"Range is limited to {LOG_MAX_RANGE_DAYS} days.")
 
-    logs = (
-        db.session.query(MembershipLog, Member)
+    conditions = [
+        MembershipLog.action_date >= datetime.combine(date_from, datetime.min.time()),
+        MembershipLog.action_date < datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+    ]
+    action_types = [name.strip() for name in args.get("action_type", "").split(",") if name.strip()]
+    if action_types:
+        conditions.append(MembershipLog.action_type.in_(action_types))
+    if args.get("member_id"):
+        conditions.append(MembershipLog.member_id == int(args["member_id"]))
+    return conditions, date_from, date_to
+
+def log_page_query(conditions, limit, after=None):
+    """One page of logs (plus one row to detect more), newest first; `after`
+    is the (action_date, log_id) keyset position of the previous page."""
+    if after is not None:
+        conditions = [*conditions, tuple_(MembershipLog.action_date, MembershipLog.log_id) < after]
+    return (
+        db.session.query(
+            MembershipLog.log_id, MembershipLog.member_id, MembershipLog.action_type,
+            MembershipLog.action_date, MembershipLog.remarks, Member.first_name, Member.last_name
+        )
         .join(Member, MembershipLog.member_id == Member.member_id)
-        .filter(MembershipLog.action_date >= one_week_ago)
-        .order_by(MembershipLog.action_date.desc())
-        .all()
+        .filter(*conditions)
+        .order_by(MembershipLog.action_date.desc(), MembershipLog.log_id.desc())
+        .limit(limit + 1)
     )
 
-    result = []
-    for log, member in logs:
-        try:
-            action_type = str(log.action_type)
-        except LookupError:
-            action_type = "Unknown"
+def log_counts_query(conditions):
+    day = func.date(MembershipLog.action_date)
+    return (
+        db.session.query(day, MembershipLog.action_type, func.count())
+        .filter(*conditions)
+        .group_by(day, MembershipLog.action_type)
+    )
+
+def daily_log_counts(conditions, date_from, date_to):
+    """{"labels": [days], "counts": {action_type: [count per day]}} with zero-filled days."""
+    rows = log_counts_query(conditions).all()
+    labels = [(date_from + timedelta(days=i)).isoformat() for i in range((date_to - date_from).days + 1)]
+    position = {label: i for i, label in enumerate(labels)}
+    counts = {}
+    for log_day, action_type, count in rows:
+        log_day = log_day.isoformat() if hasattr(log_day, "isoformat") else str(log_day)
+        counts.setdefault(action_type, [0] * len(labels))[position[log_day]] = count
+    return {"labels": labels, "counts": counts, "total": sum(count for _, _, count in rows)}
+
+@statistics.route('/admin/membership-logs', methods=['GET'])
+@cache.cached(tags=('members',))
+def get_membership_logs():
+    args = request.args
+    today = datetime.now(pytz.timezone('Asia/Manila')).date()
+    limit = min(max(args.get("limit", 50, type=int), 1), LOG_PAGE_LIMIT)
+
+    after = None
+    try:
+        conditions, date_from, date_to = _log_filters(args, today)
+        if args.get("mode") == "daily":
+            return jsonify(daily_log_counts(conditions, date_from, date_to))
+        if args.get("cursor"):
+            after = tuple(decode_cursor(args["cursor"], MembershipLog.action_date))
+    except (ValueError, TypeError, binascii.Error) as e:
+        return jsonify({"success": False, "error": f"Invalid filter or cursor: {e}"}), 400
 
-        result.append({
-            "log_id": log.log_id,
-            "member_id": member.member_id,
-            "member_name": f"{member.first_name} {member.last_name}",
-            "action_type": action_type,
-            "action_date": log.action_date.strftime("%Y-%m-%d %H:%M:%S"),
-            "remarks": log.remarks or ""
-        })
+    rows = log_page_query(conditions, limit, after).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    return jsonify(result)
+    return jsonify({
+        "logs": [
+            {
+                "log_id": log.log_id,
+                "member_id": log.member_id,
+                "member_name": f"{log.first_name} {log.last_name}",
+                "action_type": log.action_type,
+                "action_date": log.action_date.strftime("%Y-%m-%d %H:%M:%S"),
+                "remarks": log.remarks or ""
+            }
+            for log in rows
+        ],
+        "next_cursor": encode_cursor([rows[-1].action_date, rows[-1].log_id]) if has_more else None,
+        "has_more": has_more
+    })
 
 @statistics.route("/admin/statistics-summary", methods=["GET"])
+@cache.cached(tags=('members', 'payments'))
 def statistics_summary():
     tz = pytz.timezone("Asia/Manila")
     now = datetime.now(tz)
+    months = min(max(request.args.get("months", 6, type=int), 1), 60)
 
-    # --- LAST 6 MONTHS MEMBERSHIP DATA ---
-    labels = []
-    students_data = []
-    faculty_data = []
-    outsiders_data = []
-
-    for i in range(5, -1, -1):
-        target = now - timedelta(days=30 * i)
-        year, month = target.year, target.month
-        labels.append(target.strftime("%Y-%m"))
-
-        start = tz.localize(datetime(year, month, 1))
-        end = tz.localize(datetime(year + (month // 12), (month % 12) + 1, 1))
-
-        students_data.append(Member.query.filter(Member.date_registered >= start,
-                                                Member.date_registered < end,
-                                                Member.member_type == "Student").count())
-        faculty_data.append(Member.query.filter(Member.date_registered >= start,
-                                                Member.date_registered < end,
-                                                Member.member_type == "Faculty").count())
-        outsiders_data.append(Member.query.filter(Member.date_registered >= start,
-                                                Member.date_registered < end,
-                                                Member.member_type == "Outsider").count())
+    # --- MEMBERSHIP DATA PER MONTH (daily rollup, one GROUP BY) ---
+    buckets = month_buckets(now, months)
+    labels = [f"{year:04d}-{month:02d}" for year, month in buckets]
+    registrations = registrations_by_month(buckets)
+    students_data = [registrations.get((label, "Student"), 0) for label in labels]
+    faculty_data = [registrations.get((label, "Faculty"), 0) for label in labels]
+    outsiders_data = [registrations.get((label, "Outsider"), 0) for label in labels]
+
+    # --- STATUS x PAYMENT STATUS (one GROUP BY feeds every count below) ---
+    status_counts = {}
+    payment_counts = {}
+    for status, payment_status, count in Member.count_by(Member.status, Member.payment_status):
+        status_counts[status] = status_counts.get(status, 0) + count
+        payment_counts[payment_status] = payment_counts.get(payment_status, 0) + count
 
     # --- SUMMARY CARDS ---
-    total_members = Member.query.count()
-    active_members = Member.query.filter_by(status="Active").count()
+    total_members = sum(status_counts.values())
+    active_members = status_counts.get("Active", 0)
     type_counts = {"Students": sum(students_data), "Faculty": sum(faculty_data), "Outsiders": sum(outsiders_data)}
     most_active = max(type_counts, key=type_counts.get)
 
     # --- STATUS CHARTS ---
     status_overview = {
         "labels": ["Active", "Expired", "Pending"],
-        "values": [
-            Member.query.filter_by(status="Active").count(),
-            Member.query.filter_by(status="Expired").count(),
-            Member.query.filter_by(status="Pending").count()
-        ]
+        "values": [status_counts.get(label, 0) for label in ["Active", "Expired", "Pending"]]
     }
     status_chart = {
         "labels": ["Students", "Faculty", "Outsiders"],
@@ -177,36 +249,14 @@ def statistics_summary():
     }
     payment_status_chart = {
         "labels": ["Paid", "Unpaid", "Overdue"],
-        "values": [
-            Member.query.filter_by(payment_status="Paid").count(),
-            Member.query.filter_by(payment_status="Unpaid").count(),
-            Member.query.filter_by(payment_status="Overdue").count()
-        ]
+        "values": [payment_counts.get(label, 0) for label in ["Paid", "Unpaid", "Overdue"]]
     }
 
-    # --- WEEKLY REVENUE (last 7 days) ---
-    weekly_labels = []
-    weekly_values = [0] * 7
-    for i in range(6, -1, -1):
-        day = now - timedelta(days=i)
-        weekly_labels.append(day.strftime("%a"))
-
-    members = Member.query.filter(Member.payment_status == "Paid").all()
-    for m in members:
-        price = float(m.price_paid or 0)
-        created_at = m.last_payment_date or m.date_registered
-        if created_at.tzinfo is None:
-            created_at = tz.localize(created_at)
-
-        for idx, label_date in enumerate([(now - timedelta(days=i)).date() for i in range(6, -1, -1)]):
-            if created_at.date() == label_date:
-                weekly_values[idx] += price
-
     return jsonify({
         "summary": {"total": total_members, "active": active_members, "most_active": most_active},
         "overview_chart": {"labels": labels, "students": students_data, "faculty": faculty_data, "outsiders": outsiders_data},
         "status_overview": status_overview,
         "status_chart": status_chart,
         "payment_status_chart": payment_status_chart,
-        "weekly_revenue": {"labels": weekly_labels, "values": weekly_values}
+        "weekly_revenue": weekly_revenue(now)
     })
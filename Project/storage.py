@@ -0,0 +1,128 @@
+import os
+from functools import wraps
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Bind key of the engine used by read-only routes
+READ_ONLY_BIND = 'readonly'
+
+
+def _env_int(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.lower() not in ('0', 'false', 'no', 'off')
+
+
+def read_only_uri(uri):
+    """The same SQLite file opened with mode=ro; None for other backends and :memory:."""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    database = url.database if url.query.get('uri') else f"file:{url.database}"
+    return url.set(database=database, query={**url.query, 'mode': 'ro', 'uri': 'true'}) \
+        .render_as_string(hide_password=False)
+
+
+# ========================================
+# STORAGE PROFILE (URI, pool, SQLite pragmas)
+# ========================================
+class StorageProfile:
+    """Loads the database URI, pool settings and SQLite pragmas from the environment.
+
+    init_app() must run before db.init_app() (it fills SQLALCHEMY_* config);
+    install_pragmas() runs after it, once the engines exist.
+
+    A second bind (READ_ONLY_BIND) serves the analytics routes: the primary
+    SQLite file opened read-only (WAL lets it read while check-ins write), or
+    DATABASE_READ_URL, e.g. a replica, on other backends.
+    """
+
+    def init_app(self, app):
+        app.config.setdefault('SQLALCHEMY_DATABASE_URI', os.environ.get('DATABASE_URL', 'sqlite:///bookings.db'))
+
+        engine_options = {'pool_pre_ping': _env_flag('DB_POOL_PRE_PING', True)}
+        for option, name in (('pool_size', 'DB_POOL_SIZE'), ('max_overflow', 'DB_MAX_OVERFLOW'),
+                             ('pool_timeout', 'DB_POOL_TIMEOUT'), ('pool_recycle', 'DB_POOL_RECYCLE')):
+            value = _env_int(name)
+            if value is not None:
+                engine_options[option] = value
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options)
+
+        read_uri = os.environ.get('DATABASE_READ_URL') or read_only_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+        if read_uri and _env_flag('DB_READ_ONLY_ROUTING', True):
+            app.config.setdefault('SQLALCHEMY_BINDS', {}).setdefault(READ_ONLY_BIND, read_uri)
+
+        # Applied to every new SQLite connection; None skips the pragma
+        app.config.setdefault('SQLITE_PRAGMAS', {
+            'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+            'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+            'mmap_size': _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+            'cache_size': _env_int('SQLITE_CACHE_SIZE', -64 * 1024),  # negative = KiB, i.e. 64 MiB
+            'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT', 5000),    # ms to wait on a locked database
+            'foreign_keys': 'ON' if _env_flag('SQLITE_FOREIGN_KEYS', True) else 'OFF'
+        })
+        app.extensions['storage_profile'] = self
+
+    def install_pragmas(self, app, db):
+        """Attach the pragma hook to every SQLite engine (default bind and extra binds)."""
+        pragmas = {name: value for name, value in app.config['SQLITE_PRAGMAS'].items() if value is not None}
+        # The read-only connection cannot change the journal mode; it only reads
+        read_pragmas = {name: value for name, value in pragmas.items() if name not in ('journal_mode', 'foreign_keys')}
+        read_pragmas['query_only'] = 'ON'
+
+        with app.app_context():
+            for bind_key, engine in db.engines.items():
+                if engine.dialect.name == 'sqlite':
+                    hook = self._pragma_hook(read_pragmas if bind_key == READ_ONLY_BIND else pragmas)
+                    event.listen(engine, 'connect', hook)
+
+    @staticmethod
+    def _pragma_hook(pragmas):
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+        return set_pragmas
+
+
+# ========================================
+# READ-ONLY ROUTING
+# ========================================
+class RoutingSession(Session):
+    """Session that sends every statement to the read-only bind once a route opts in."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('read_only'):
+            engine = self._db.engines.get(READ_ONLY_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_read_only():
+    """Route this request's queries to the read-only bind (usable as a before_request hook)."""
+    from . import db
+
+    db.session.info['read_only'] = True
+
+
+def read_only(view):
+    """View decorator form of use_read_only(); the view must not write."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        use_read_only()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+storage = StorageProfile()
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, session, redirect, url_for, flash
 from . import db
-from .models import Member, MembershipLog, GymPricing
+from .models import Member, GymPricing
+from .members import unit_of_work, register_member
 from datetime import datetime, timedelta
 from werkzeug.security import check_password_hash
 import pytz
@@ -87,7 +88,7 @@ def user_register():
             errors.append('Annual plans are not available yet.')
 
         # Check for existing email
-        existing_member = Member.query.filter_by(email=email).first()
+        existing_member = Member.by_email(email).first()
         if existing_member:
             if existing_member.password_hash:
                 errors.append('Email already registered. Please login instead.')
@@ -130,17 +131,10 @@ def user_register():
 
         # Save to database
         try:
-            db.session.add(new_member)
-            db.session.commit()
-
-            # Create membership log
-            log = MembershipLog(
-                member_id=new_member.member_id,
-                action_type='User Registration',
-                remarks=f'User self-registered with {gym_plan} plan'
-            )
-            db.session.add(log)
-            db.session.commit()
+            # Member, payment and membership log in one transaction
+            with unit_of_work('members', 'payments'):
+                register_member(new_member, 'User Registration',
+                                f'User self-registered with {gym_plan} plan')
 
             flash(f'Registration successful! Your Member ID is {new_member.unique_code}. Please login.', 'success')
             return redirect(url_for('userAuth.user_login'))
@@ -173,7 +167,7 @@ def user_login():
             return render_template('user/user_login.html')
 
         # Find user
-        member = Member.query.filter_by(email=email).first()
+        member = Member.by_email(email).first()
 
         if not member:
             flash('Invalid email or password.', 'error')
@@ -189,10 +183,8 @@ def user_login():
             flash('Invalid email or password.', 'error')
             return render_template('user/user_login.html')
 
-        # Check membership status
-        member.check_and_update_status()
-
-        if member.status == 'Expired':
+        # Check membership status (computed, nothing is written on login)
+        if member.effective_status == 'Expired':
             flash('Your membership has expired. Please renew to continue.', 'warning')
             # Still allow login to see expired status
 
@@ -266,9 +258,6 @@ def admin_member_login():
             flash('Email does not match the Member ID.', 'error')
             return render_template('user/activate_account.html')
 
-        # Check membership status
-        member.check_and_update_status()
-
         # Successful login
         session['user_id'] = member.member_id
         session['user_name'] = f"{member.first_name} {member.last_name}"
@@ -1,6 +1,9 @@
 from flask import Blueprint, render_template, request, session, redirect, url_for, flash
 from . import db
+from .cache import cache
 from .models import Member, RenewalRequest
+from .rollups import record_renewal_request
+from .live import broker
 import pytz
 from datetime import datetime
 
@@ -23,7 +26,7 @@ def user_request_renewal():
         return redirect(url_for('userRoutes.dashboard'))
 
     # Prevent multiple pending requests
-    existing = RenewalRequest.query.filter_by(member_id=user_id, status="Pending").first()
+    existing = RenewalRequest.pending_for(user_id).first()
     if existing:
         flash("You already have a pending renewal request.", "info")
         return redirect(url_for('userRoutes.membership'))
@@ -37,7 +40,18 @@ def user_request_renewal():
     # Create new renewal request
     new_request = RenewalRequest(member_id=user_id, requested_plan=requested_plan)
     db.session.add(new_request)
+    record_renewal_request(member)
     db.session.commit()
+    cache.invalidate('renewals')
+    broker.publish('renewal_request', {
+        "id": new_request.id,
+        "first_name": member.first_name,
+        "last_name": member.last_name,
+        "member_type": member.member_type,
+        "current_plan": member.gym_plan,
+        "requested_plan": requested_plan,
+        "status": "Pending"
+    })
 
     flash(f"Renewal request submitted for {requested_plan} plan.", "success")
     return redirect(url_for('userRoutes.membership'))
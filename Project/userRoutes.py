@@ -1,8 +1,12 @@
 from flask import Blueprint, render_template, request, session, redirect, url_for, flash, jsonify
 from functools import wraps
 from . import db
-from .models import Member, Workout, AttendanceLog
-from datetime import datetime, timedelta
+from .cache import cache
+from .members import unit_of_work
+from .models import Member, Workout, AttendanceLog, MemberStats
+from .activity import streak, days_in_month, heatmap, KINDS
+from .attendance import time_in, time_out
+from datetime import datetime
 import pytz
 
 userRoutes = Blueprint('userRoutes', __name__)
@@ -35,30 +39,24 @@ def dashboard():
         session.clear()
         return redirect(url_for('userAuth.user_login'))
 
-    # Update status
-    member.check_and_update_status()
-
     tz = pytz.timezone('Asia/Manila')
     today = datetime.now(tz).date()
 
     # Days remaining
     days_remaining = (member.end_date - today).days if member.end_date > today else 0
 
-    # Workout stats
-    total_workouts = Workout.query.filter_by(member_id=user_id).count()
-    total_minutes = db.session.query(
-        db.func.sum(Workout.duration_minutes)
-    ).filter_by(member_id=user_id).scalar() or 0
-
-    total_hours = round(total_minutes / 60, 1)
-
-    # Attendance count
-    attendance_count = AttendanceLog.query.filter_by(member_id=user_id).count()
+    # Workout and attendance counters (one row, maintained on write)
+    stats = db.session.get(MemberStats, user_id) or MemberStats(total_workouts=0, total_minutes=0, attendance_days=0)
+    total_workouts = stats.total_workouts
+    total_hours = round(stats.total_minutes / 60, 1)
+    attendance_count = stats.attendance_days
 
     # Recent workouts
-    recent_workouts = Workout.query.filter_by(member_id=user_id) \
-        .order_by(Workout.workout_date.desc()) \
-        .limit(5).all()
+    recent_workouts = Workout.recent_for(user_id).all() if total_workouts else []
+
+    # Day bitmaps: streak and this month's attendance without scanning history
+    workout_streak = calculate_workout_streak(user_id)
+    attended_this_month = days_in_month(user_id, 'attendance', today.year, today.month)
 
     return render_template(
         'user/user_dashboard.html',
@@ -67,39 +65,41 @@ def dashboard():
         total_workouts=total_workouts,
         total_hours=total_hours,
         recent_workouts=recent_workouts,
-        attendance_count=attendance_count
+        attendance_count=attendance_count,
+        workout_streak=workout_streak,
+        attended_this_month=attended_this_month
     )
 
 # ========================================
 # HELPER: Calculate Workout Streak
 # ========================================
 def calculate_workout_streak(member_id):
-    """Calculate consecutive days with at least one workout."""
+    """Calculate consecutive days with at least one workout (from the day bitmaps)."""
     tz = pytz.timezone('Asia/Manila')
     today = datetime.now(tz).date()
 
-    workouts = Workout.query.filter_by(member_id=member_id).order_by(Workout.workout_date.desc()).all()
+    return streak(member_id, 'workout', today)
 
-    if not workouts:
-        return 0
-
-    # Get unique workout dates
-    workout_dates = set()
-    for workout in workouts:
-        workout_date = workout.workout_date
-        if workout_date.tzinfo is None:
-            workout_date = tz.localize(workout_date)
-        workout_dates.add(workout_date.date())
-
-    # Calculate streak
-    streak = 0
-    current_date = today
+# ========================================
+# ACTIVITY CALENDAR (heatmap data)
+# ========================================
+@userRoutes.route('/user/activity-calendar', methods=['GET'])
+@user_login_required
+def activity_calendar():
+    user_id = session.get('user_id')
+    tz = pytz.timezone('Asia/Manila')
+    year = request.args.get('year', datetime.now(tz).year, type=int)
+    kind = request.args.get('kind', 'attendance')
 
-    while current_date in workout_dates:
-        streak += 1
-        current_date -= timedelta(days=1)
+    if kind not in KINDS:
+        return jsonify({"success": False, "error": "kind must be workout or attendance."}), 400
 
-    return streak
+    return jsonify({
+        "success": True,
+        "year": year,
+        "kind": kind,
+        "days": heatmap(user_id, kind, year)
+    })
 
 # ========================================
 # USER PROFILE (View)
@@ -135,12 +135,10 @@ def update_profile():
     contact_number = request.form.get('contact_number', '').strip()
     address = request.form.get('address', '').strip()
 
-    # Update fields
-    member.contact_number = contact_number
-    member.address = address
-
     try:
-        db.session.commit()
+        with unit_of_work('members'):
+            member.contact_number = contact_number
+            member.address = address
         flash('Profile updated successfully!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -163,13 +161,10 @@ def membership():
         session.clear()
         return redirect(url_for('userAuth.user_login'))
 
-    # Update status
-    member.check_and_update_status()
-
     # Calculate days remaining
     tz = pytz.timezone('Asia/Manila')
     today = datetime.now(tz).date()
-    days_remaining = (member.end_date - today).days if member.end_date > today and member.status == 'Active'  else 0
+    days_remaining = (member.end_date - today).days if member.end_date > today and member.effective_status == 'Active' else 0
 
     return render_template('user/user_membership.html',
                         member=member,
@@ -204,19 +199,14 @@ def attendance_time_in():
     user_id = session.get("user_id")
     tz = pytz.timezone("Asia/Manila")
     now = datetime.now(tz)
-    today = now.date()
-
-    record = AttendanceLog.query.filter_by(member_id=user_id, date=today).first()
 
-    if record and record.time_in:
+    # Single upsert; a double tap or a concurrent request gets "already"
+    if not time_in(user_id, now):
+        db.session.rollback()
         return jsonify({"success": False, "message": "Already timed in today."})
 
-    if not record:
-        record = AttendanceLog(member_id=user_id, date=today)
-
-    record.time_in = now
-    db.session.add(record)
     db.session.commit()
+    cache.invalidate('attendance')
 
     return jsonify({"success": True})
 
@@ -228,17 +218,16 @@ def attendance_time_out():
     user_id = session.get("user_id")
     tz = pytz.timezone("Asia/Manila")
     now = datetime.now(tz)
-    today = now.date()
-
-    record = AttendanceLog.query.filter_by(member_id=user_id, date=today).first()
 
-    if not record or not record.time_in:
+    result = time_out(user_id, now)
+    if result == 'not_in':
+        db.session.rollback()
         return jsonify({"success": False, "message": "You must time in first."})
-
-    if record.time_out:
+    if result == 'already_out':
+        db.session.rollback()
         return jsonify({"success": False, "message": "Already timed out."})
 
-    record.time_out = now
     db.session.commit()
+    cache.invalidate('attendance')
 
     return jsonify({"success": True})
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Attendance analytics benchmark: a year of check-ins through /admin/analytics/attendance.
+
+Seeds --members members who each visit on roughly --visit-rate of the days
+of the last year (arrivals clustered around morning and evening peaks,
+stays of 20 minutes to 3 hours), then times the endpoint cold and cached.
+With --check, the heatmap arrivals, dwell histogram and the busiest-day
+peak are recomputed with plain Python loops and compared (exits 1 on a
+mismatch; use a small --members for this).
+
+    python benchmarks/attendance_analytics.py [--members 3000] [--visit-rate 0.3] [--check]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from attendance_writes import build_app
+
+PEAK_HOURS = (6, 7, 8, 17, 18, 19)
+
+
+def seed(app, member_ids, visit_rate, today):
+    from Project import db
+    from Project.models import AttendanceLog
+
+    rng = random.Random(7)
+    rows = []
+    for offset in range(1, 366):
+        day = today - timedelta(days=offset)
+        for member_id in member_ids:
+            if rng.random() >= visit_rate:
+                continue
+            hour = rng.choice(PEAK_HOURS) if rng.random() < 0.7 else rng.randint(5, 21)
+            time_in = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour, minutes=rng.randint(0, 59))
+            time_out = None if rng.random() < 0.02 else time_in + timedelta(minutes=rng.randint(20, 180))
+            rows.append({'member_id': member_id, 'date': day, 'time_in': time_in, 'time_out': time_out})
+
+    with app.app_context():
+        for start in range(0, len(rows), 50000):
+            db.session.execute(db.insert(AttendanceLog), rows[start:start + 50000])
+        db.session.commit()
+    return rows
+
+
+def reference(rows, slot_minutes):
+    """Arrivals, dwell counts and busiest-day peak with plain loops."""
+    from Project.analytics import DWELL_EDGES
+
+    arrivals = Counter()
+    dwell = Counter()
+    events = []
+    for row in rows:
+        time_in, time_out = row['time_in'], row['time_out']
+        minute = time_in.hour * 60 + time_in.minute
+        arrivals[(time_in.weekday(), minute // slot_minutes)] += 1
+        if time_out is None:
+            continue
+        stay = (time_out - time_in).total_seconds() // 60
+        dwell[sum(1 for edge in DWELL_EDGES[1:] if stay >= edge)] += 1
+        events += [(time_in.replace(second=0, microsecond=0), 1), (time_out.replace(second=0, microsecond=0), -1)]
+
+    level, peak = 0, 0
+    for _, step in sorted(events, key=lambda event: (event[0], event[1])):
+        level += step
+        peak = max(peak, level)
+    return arrivals, dwell, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=3000)
+    parser.add_argument('--visit-rate', type=float, default=0.3)
+    parser.add_argument('--check', action='store_true')
+    args = parser.parse_args()
+
+    from Project import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, member_ids = build_app('wal', os.path.join(tmp, 'analytics.db'), args.members)
+        today = date.today()
+        started = time.perf_counter()
+        rows = seed(app, member_ids, args.visit_rate, today)
+        print(f"seeded {len(rows)} check-ins in {time.perf_counter() - started:.1f}s")
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['admin_id'] = 1
+        date_from = today - timedelta(days=365)
+        url = f"/admin/analytics/attendance?date_from={date_from}&date_to={today - timedelta(days=1)}&granularity=60"
+
+        for label in ('cold', 'cached'):
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - started
+            print(f"{label:6} {response.status_code} in {elapsed * 1000:.0f} ms")
+        data = response.get_json()
+        print(f"sessions {data['sessions']}, peak {data['peaks']['max']}, median stay {data['dwell']['median_minutes']} min")
+
+        with app.app_context():
+            db.engine.dispose()
+
+    if not args.check:
+        return
+
+    arrivals, dwell, peak = reference(rows, 60)
+    checks = {
+        'sessions': data['sessions'] == len(rows),
+        'arrivals heatmap': all(
+            data['heatmap']['arrivals'][weekday][slot] == arrivals.get((weekday, slot), 0)
+            for weekday in range(7) for slot in range(24)
+        ),
+        'dwell histogram': data['dwell']['counts'] == [dwell.get(index, 0) for index in range(len(data['dwell']['counts']))],
+        'peak occupancy': data['peaks']['max']['count'] == peak
+    }
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
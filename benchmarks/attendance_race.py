@@ -0,0 +1,91 @@
+"""Parallel double-tap check: many clients time the same members in and out at once.
+
+Every member is tapped by --taps threads at the same moment, first on time-in
+and then on time-out. The run passes when each member got exactly one
+successful time-in and one successful time-out, there is one attendance row
+per member, and the check-in counters (daily_stats, member_stats, the
+attendance bitmap) each counted every member once. Exits 1 otherwise.
+
+    python benchmarks/attendance_race.py [--members 200] [--taps 6]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import os
+
+from attendance_writes import build_app
+
+
+def fire(app, member_ids, taps, action):
+    """POST action for every member from `taps` threads released together; returns successes per member."""
+    barrier = threading.Barrier(taps)
+    successes = Counter()
+    lock = threading.Lock()
+
+    def tapper():
+        client = app.test_client()
+        barrier.wait()
+        for member_id in member_ids:
+            with client.session_transaction() as session:
+                session['user_id'] = member_id
+            response = client.post(f"/user/attendance/{action}")
+            if response.status_code == 200 and response.get_json().get('success'):
+                with lock:
+                    successes[member_id] += 1
+
+    with ThreadPoolExecutor(max_workers=taps) as pool:
+        for future in [pool.submit(tapper) for _ in range(taps)]:
+            future.result()
+    return successes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=200)
+    parser.add_argument('--taps', type=int, default=6)
+    args = parser.parse_args()
+
+    from Project import db
+    from Project.models import AttendanceLog, DailyStats, MemberStats
+    from Project.activity import days_in_month
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, member_ids = build_app('wal', os.path.join(tmp, 'race.db'), args.members)
+
+        started = time.perf_counter()
+        checked_in = fire(app, member_ids, args.taps, 'time_in')
+        checked_out = fire(app, member_ids, args.taps, 'time_out')
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            today = date.today()
+            rows = db.session.query(AttendanceLog).count()
+            open_rows = db.session.query(AttendanceLog).filter(AttendanceLog.time_out.is_(None)).count()
+            daily = db.session.query(db.func.sum(DailyStats.check_ins)).scalar() or 0
+            days = db.session.query(db.func.sum(MemberStats.attendance_days)).scalar() or 0
+            marked = sum(days_in_month(member_id, 'attendance', today.year, today.month) for member_id in member_ids)
+            db.engine.dispose()
+
+    checks = {
+        'one time-in per member': set(checked_in.values()) == {1} and len(checked_in) == args.members,
+        'one time-out per member': set(checked_out.values()) == {1} and len(checked_out) == args.members,
+        'one row per member': rows == args.members,
+        'every row timed out': open_rows == 0,
+        'daily_stats check_ins': daily == args.members,
+        'member_stats attendance_days': days == args.members,
+        'attendance bitmap days': marked == args.members
+    }
+    requests = 2 * args.members * args.taps
+    print(f"{requests} requests in {elapsed:.2f}s ({requests / elapsed:.0f}/s)")
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Concurrent check-in benchmark: legacy SQLite settings vs. the storage profile.
+
+Each profile gets a fresh database file. Writer threads time members in and
+out through the real attendance routes while reader threads run the kind of
+aggregate scan the statistics pages issue. Reported per profile: completed
+writes/s, reads/s and how many requests failed (e.g. "database is locked").
+
+    python benchmarks/attendance_writes.py [--members 2000] [--writers 8] [--readers 2] [--seconds 10]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+PROFILES = {
+    # What create_app used before: rollback journal, full sync, pysqlite's 5 s busy wait
+    'legacy': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_MMAP_SIZE': '0',
+        'SQLITE_CACHE_SIZE': '-2000',
+        'SQLITE_BUSY_TIMEOUT': '5000'
+    },
+    # Defaults of Project/storage.py
+    'wal': {}
+}
+PROFILE_KEYS = ('SQLITE_JOURNAL_MODE', 'SQLITE_SYNCHRONOUS', 'SQLITE_MMAP_SIZE',
+                'SQLITE_CACHE_SIZE', 'SQLITE_BUSY_TIMEOUT')
+
+
+def build_app(profile, path, members):
+    for key in PROFILE_KEYS:
+        os.environ.pop(key, None)
+    os.environ.update(PROFILES[profile])
+    os.environ['DATABASE_URL'] = f"sqlite:///{path}"
+    os.environ['EXPIRY_SCHEDULER'] = '0'
+
+    from Project import create_app, db
+    from Project.models import Member
+
+    app = create_app()
+    app.logger.disabled = True  # failed writes are counted, not printed
+    with app.app_context():
+        today = date.today()
+        db.session.execute(db.insert(Member), [
+            {
+                'unique_code': f"BEN-{i:05d}", 'first_name': f"Bench{i}", 'last_name': 'Member',
+                'member_type': 'Student', 'gym_plan': 'Monthly', 'status': 'Active',
+                'start_date': today, 'end_date': today + timedelta(days=30)
+            }
+            for i in range(members)
+        ])
+        db.session.commit()
+        member_ids = [row[0] for row in db.session.query(Member.member_id)]
+    return app, member_ids
+
+
+def run(profile, members, writers, readers, seconds):
+    from Project import db
+    from Project.models import AttendanceLog, Member
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, member_ids = build_app(profile, os.path.join(tmp, 'bench.db'), members)
+        stop = threading.Event()
+        counts = {'writes': 0, 'reads': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def bump(key):
+            with lock:
+                counts[key] += 1
+
+        def writer(ids):
+            client = app.test_client()
+            for member_id in ids:
+                with client.session_transaction() as session:
+                    session['user_id'] = member_id
+                for action in ('time_in', 'time_out'):
+                    if stop.is_set():
+                        return
+                    try:
+                        response = client.post(f"/user/attendance/{action}")
+                        ok = response.status_code == 200 and response.get_json().get('success')
+                    except Exception:
+                        ok = False
+                    bump('writes' if ok else 'errors')
+
+        def reader():
+            while not stop.is_set():
+                with app.app_context():
+                    try:
+                        db.session.query(Member.member_type, db.func.count(AttendanceLog.attendance_id)) \
+                            .join(Member, AttendanceLog.member_id == Member.member_id) \
+                            .group_by(Member.member_type).all()
+                        bump('reads')
+                    except Exception:
+                        bump('errors')
+                    finally:
+                        db.session.remove()
+
+        threads = [threading.Thread(target=writer, args=(member_ids[i::writers],)) for i in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            db.engine.dispose()
+
+    return {
+        'writes_per_s': round(counts['writes'] / elapsed, 1),
+        'reads_per_s': round(counts['reads'] / elapsed, 1),
+        'errors': counts['errors']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=2000)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'writes/s':>10} {'reads/s':>10} {'errors':>8}")
+    for profile in PROFILES:
+        result = run(profile, args.members, args.writers, args.readers, args.seconds)
+        print(f"{profile:<8} {result['writes_per_s']:>10} {result['reads_per_s']:>10} {result['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Member write benchmark: two commits per write vs. one unit of work.
+
+Before Project/members.py, registering or editing a member committed the
+member change and then its MembershipLog in a second transaction. This
+times both patterns, per storage profile, for --count registrations and
+--count edits (member row + rollups + log), and reports writes/s. With
+--durable-only only the 'legacy' profile (synchronous=FULL) is run, where
+each commit is an fsync and the difference is largest.
+
+    python benchmarks/member_writes.py [--count 500] [--durable-only]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from attendance_writes import build_app, PROFILES
+
+
+def two_commits_register(member):
+    from Project import db
+    from Project.cache import cache
+    from Project.models import MembershipLog, Payment
+    from Project.rollups import record_registration, record_payment
+
+    payment = Payment.for_member(member, 'Registration')
+    db.session.add(member)
+    db.session.add(payment)
+    record_registration(member)
+    record_payment(payment)
+    db.session.commit()
+    db.session.add(MembershipLog(member_id=member.member_id, action_type='Registered', remarks='bench'))
+    db.session.commit()
+    cache.invalidate('members', 'payments')
+
+
+def two_commits_edit(member):
+    from Project import db
+    from Project.cache import cache
+    from Project.models import MembershipLog
+    from Project.rollups import record_status_change, member_key
+
+    before = member_key(member)
+    member.status = 'Inactive' if member.status == 'Active' else 'Active'
+    record_status_change(before, member_key(member))
+    db.session.commit()
+    db.session.add(MembershipLog(member_id=member.member_id, action_type='Updated', remarks='bench'))
+    db.session.commit()
+    cache.invalidate('members', 'renewals')
+
+
+def unit_of_work_register(member):
+    from Project.members import unit_of_work, register_member
+
+    with unit_of_work('members', 'payments'):
+        register_member(member, 'Registered', 'bench')
+
+
+def unit_of_work_edit(member):
+    from Project.members import unit_of_work, record_change
+    from Project.rollups import member_key
+
+    with unit_of_work('members', 'renewals'):
+        before = member_key(member)
+        member.status = 'Inactive' if member.status == 'Active' else 'Active'
+        record_change(member, before, 'Updated', 'bench')
+
+
+PATTERNS = {
+    'two commits': (two_commits_register, two_commits_edit),
+    'unit of work': (unit_of_work_register, unit_of_work_edit)
+}
+
+
+def run(profile, pattern, count):
+    from Project import db
+    from Project.models import Member, MembershipLog
+
+    register, edit = PATTERNS[pattern]
+    with tempfile.TemporaryDirectory() as tmp:
+        app, _ = build_app(profile, os.path.join(tmp, 'members.db'), 1)
+        with app.app_context():
+            today = date.today()
+            members = []
+            started = time.perf_counter()
+            for i in range(count):
+                member = Member(first_name=f"Bench{i}", last_name='Member', member_type='Student',
+                                gym_plan='Monthly', status='Active', payment_status='Paid',
+                                start_date=today, end_date=today + timedelta(days=30), price_paid=500.0)
+                register(member)
+                members.append(member)
+            registered = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for member in members:
+                edit(member)
+            edited = time.perf_counter() - started
+
+            logs = db.session.query(MembershipLog).count()
+            db.engine.dispose()
+    return count / registered, count / edited, logs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--durable-only', action='store_true')
+    args = parser.parse_args()
+
+    profiles = ['legacy'] if args.durable_only else list(PROFILES)
+    print(f"{'profile':8} {'pattern':13} {'registers/s':>12} {'edits/s':>10} {'logs':>6}")
+    for profile in profiles:
+        for pattern in PATTERNS:
+            registers, edits, logs = run(profile, pattern, args.count)
+            print(f"{profile:8} {pattern:13} {registers:12.0f} {edits:10.0f} {logs:6d}")
+
+
+if __name__ == '__main__':
+    main()
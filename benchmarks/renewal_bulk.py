@@ -0,0 +1,70 @@
+"""Renewal approval benchmark: one request per call vs. /admin/renewals/bulk.
+
+Seeds --requests members with one pending renewal request each, then approves
+them through POST /admin/renewal/<id> one at a time and, on a fresh database,
+through POST /admin/renewals/bulk in calls of --batch IDs. Reports approvals/s.
+
+    python benchmarks/renewal_bulk.py [--requests 500] [--batch 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from attendance_writes import build_app
+
+
+def seed_requests(app, member_ids):
+    from Project import db
+    from Project.models import RenewalRequest
+
+    with app.app_context():
+        db.session.execute(db.insert(RenewalRequest), [
+            {'member_id': member_id, 'requested_plan': 'Monthly', 'status': 'Pending'}
+            for member_id in member_ids
+        ])
+        db.session.commit()
+        return [row[0] for row in db.session.query(RenewalRequest.id)]
+
+
+def run(mode, count, batch):
+    from Project import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, member_ids = build_app('wal', os.path.join(tmp, 'renewals.db'), count)
+        request_ids = seed_requests(app, member_ids)
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['admin_id'] = 1
+
+        started = time.perf_counter()
+        if mode == 'one by one':
+            for request_id in request_ids:
+                client.post(f"/admin/renewal/{request_id}", json={'status': 'Approved'})
+        else:
+            for start in range(0, len(request_ids), batch):
+                client.post('/admin/renewals/bulk',
+                            json={'request_ids': request_ids[start:start + batch], 'status': 'Approved'})
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            approved = db.session.execute(
+                db.text("SELECT count(*) FROM renewal_requests WHERE status = 'Approved'")
+            ).scalar()
+            db.engine.dispose()
+    return count / elapsed, approved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    for mode in ('one by one', 'bulk'):
+        rate, approved = run(mode, args.requests, args.batch)
+        print(f"{mode:10} {rate:8.0f} approvals/s ({approved} approved)")
+
+
+if __name__ == '__main__':
+    main()
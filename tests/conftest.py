@@ -0,0 +1,38 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """The application on a fresh SQLite file (WAL, so threads can share it)."""
+    os.environ['DATABASE_URL'] = f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}"
+    os.environ['EXPIRY_SCHEDULER'] = '0'
+
+    from Project import create_app, db
+
+    app = create_app()
+    app.config['TESTING'] = True
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+
+@pytest.fixture
+def member_id(app):
+    """A new Active member; returns its member_id."""
+    from Project import db
+    from Project.models import Member
+
+    with app.app_context():
+        member = Member(first_name='Test', last_name='Member', member_type='Student',
+                        gym_plan='Monthly', status='Active', payment_status='Paid',
+                        start_date=date.today(), end_date=date.today() + timedelta(days=30), price_paid=500.0)
+        db.session.add(member)
+        db.session.commit()
+        return member.member_id
@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.mark.parametrize('method, url', [
+    ('post', '/admin/members/import'),
+    ('get', '/admin/export/members'),
+    ('get', '/admin/pricing'),
+    ('post', '/admin/pricing'),
+    ('get', '/admin/live/occupancy'),
+    ('get', '/admin/live/stream'),
+    ('get', '/admin/analytics/attendance'),
+])
+def test_admin_api_needs_admin_session(app, method, url):
+    response = getattr(app.test_client(), method)(url)
+    assert response.status_code == 401
+    assert response.get_json() == {"success": False, "error": "Admin login required."}
+
+
+def test_admin_session_passes_the_guard(app):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['admin_id'] = 1
+    assert client.get('/admin/pricing').status_code == 200
+    assert client.post('/admin/pricing', json={}).status_code == 400  # validation, not the guard
@@ -0,0 +1,80 @@
+import threading
+from datetime import datetime
+
+import pytz
+
+import Project.attendance as attendance
+
+TAPS = 8
+
+
+def tap_concurrently(app, member_id, url):
+    """POST `url` from TAPS threads released together, each with its own
+    test client logged in as the member; returns the JSON responses."""
+    barrier = threading.Barrier(TAPS)
+    responses, errors = [], []
+    lock = threading.Lock()
+
+    def tap():
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = member_id
+        try:
+            barrier.wait()
+            response = client.post(url)
+            with lock:
+                responses.append((response.status_code, response.get_json()))
+        except Exception as exc:  # surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=tap) for _ in range(TAPS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    return responses
+
+
+def daily_check_ins(day):
+    from Project import db
+    from Project.models import DailyStats
+
+    return db.session.query(db.func.coalesce(db.func.sum(DailyStats.check_ins), 0)).filter(DailyStats.day == day).scalar()
+
+
+def test_concurrent_time_in_records_one_check_in(app, member_id, monkeypatch):
+    from Project.models import AttendanceLog
+
+    record_check_in = attendance.record_check_in
+    calls = []
+
+    def counting_record_check_in(*args):
+        calls.append(args)
+        return record_check_in(*args)
+
+    monkeypatch.setattr(attendance, 'record_check_in', counting_record_check_in)
+    today = datetime.now(pytz.timezone('Asia/Manila')).date()
+    with app.app_context():
+        before = daily_check_ins(today)
+
+    responses = tap_concurrently(app, member_id, '/user/attendance/time_in')
+
+    already = (200, {"success": False, "message": "Already timed in today."})
+    assert sorted(responses, key=str) == sorted([(200, {"success": True})] + [already] * (TAPS - 1), key=str)
+    assert calls == [(member_id, today)]
+    with app.app_context():
+        assert AttendanceLog.query.filter_by(member_id=member_id).count() == 1
+        assert daily_check_ins(today) - before == 1
+
+
+def test_concurrent_time_out_closes_the_session_once(app, member_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = member_id
+    assert client.post('/user/attendance/time_in').get_json() == {"success": True}
+
+    responses = tap_concurrently(app, member_id, '/user/attendance/time_out')
+
+    already = (200, {"success": False, "message": "Already timed out."})
+    assert sorted(responses, key=str) == sorted([(200, {"success": True})] + [already] * (TAPS - 1), key=str)
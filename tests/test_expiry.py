@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+import Project.addMember as addMember
+
+
+def add_member(app, status, end_date):
+    from Project import db
+    from Project.models import Member
+
+    with app.app_context():
+        member = Member(first_name='Test', last_name='Member', member_type='Student',
+                        gym_plan='Monthly', status=status, payment_status='Paid',
+                        start_date=end_date - timedelta(days=30), end_date=end_date, price_paid=500.0)
+        db.session.add(member)
+        db.session.commit()
+        return member.member_id
+
+
+def status_and_logs(app, member_id):
+    from Project import db
+    from Project.models import Member, MembershipLog
+
+    with app.app_context():
+        logs = MembershipLog.query.filter_by(member_id=member_id, action_type='Status Update').count()
+        return db.session.get(Member, member_id).status, logs
+
+
+def test_member_changed_after_the_chunk_was_read_is_left_alone(app, monkeypatch):
+    # The admin extended this member's end date after the sweep picked its id
+    renewed_id = add_member(app, 'Inactive', date.today() + timedelta(days=30))
+    lapsed_members_query = addMember.lapsed_members_query
+
+    def query_with_renewed_member(today, after_id, limit):
+        ids = [row[0] for row in lapsed_members_query(today, after_id, limit)]
+        return [(member_id,) for member_id in sorted(ids + [renewed_id]) if member_id > after_id]
+
+    monkeypatch.setattr(addMember, 'lapsed_members_query', query_with_renewed_member)
+    with app.app_context():
+        addMember.auto_update_expired_members()
+
+    assert status_and_logs(app, renewed_id) == ('Inactive', 0)
+
+
+def test_sweep_expires_active_member_past_end_date(app):
+    from Project import db
+    from Project.models import DailyStats
+    from Project.scheduler import run_expiry_sweep
+
+    def active_delta():
+        return db.session.query(db.func.coalesce(db.func.sum(DailyStats.active_delta), 0)).filter(
+            DailyStats.member_type == 'Student', DailyStats.plan_type == 'Monthly').scalar()
+
+    member_id = add_member(app, 'Active', date.today() - timedelta(days=1))
+    with app.app_context():
+        before = active_delta()
+        run_expiry_sweep()
+        after = active_delta()
+
+    assert status_and_logs(app, member_id) == ('Expired', 1)
+    assert after - before == -1
@@ -0,0 +1,26 @@
+from Project.kiosk import member_codes
+
+
+def test_type_change_retires_the_old_code(app, member_id):
+    from Project import db
+    from Project.models import Member
+
+    with app.app_context():
+        member = db.session.get(Member, member_id)
+        old_code = member.unique_code
+        assert member_codes.resolve([old_code]) == {old_code: member_id}
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['admin_id'] = 1
+    response = client.post(f"/admin/member/{member_id}/edit", json={
+        'member_type': 'Faculty',
+        'start_date': member.start_date.isoformat(),
+        'end_date': member.end_date.isoformat()
+    })
+    assert response.status_code == 200
+
+    with app.app_context():
+        new_code = db.session.get(Member, member_id).unique_code
+        assert new_code != old_code
+        assert member_codes.resolve([old_code, new_code]) == {new_code: member_id}
@@ -0,0 +1,37 @@
+import pytest
+
+from Project.queryplans import full_scans
+
+
+def test_hot_queries_use_an_index(app):
+    from Project import db
+    from Project.queryplans import check_query_plans
+
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            pytest.skip("EXPLAIN QUERY PLAN is SQLite only")
+        report = check_query_plans()
+
+    assert report
+    failures = {name: plan for name, plan, scans in report if scans}
+    assert not failures
+
+
+@pytest.mark.parametrize('line', [
+    'SCAN members',
+    'SCAN members USING INDEX ix_members_status_payment',
+    'SCAN attendance_logs USING COVERING INDEX ix_attendance_logs_date_times',
+])
+def test_full_scans_of_large_tables_fail(line):
+    assert full_scans([line]) == [line]
+
+
+@pytest.mark.parametrize('line', [
+    'SEARCH members USING INDEX ix_members_email (email=?)',
+    'SEARCH members USING INTEGER PRIMARY KEY (rowid=?)',
+    'SCAN gym_pricing',
+    'SCAN CONSTANT ROW',
+    'USE TEMP B-TREE FOR ORDER BY',
+])
+def test_index_lookups_and_small_tables_pass(line):
+    assert full_scans([line]) == []